@@ -1,19 +1,90 @@
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+import os
+import secrets
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 import jwt
 
 from app.core.config import settings
+from app.core.cache import TTLCache
 from app.core.db import get_db
 from app.domains.auth.models import User
+from app.domains.auth.token_versions import token_versions
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Who is calling and what they may do, as stated by a current token."""
+    id: str
+    username: str
+    is_active: bool
+    is_creator: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Immutable snapshot of the authenticated user, safe to share between requests."""
+    id: str
+    email: str
+    username: str
+    is_active: bool
+    is_creator: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            is_creator=user.is_creator,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+# Snapshots keyed by the token's sub, per worker; the TTL bounds how long
+# another worker can act on flags changed elsewhere
+user_cache = TTLCache(settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_ENTRIES)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: user_cache.reset_after_fork())
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _queue_user_invalidation(mapper, connection, target):
+    # Applied after commit, so a concurrent request cannot re-cache the old row
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_users", {})[target.id] = target.token_version or 0
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    changed = session.info.pop("changed_users", None)
+    if changed:
+        user_cache.delete(*changed)
+        for user_id, version in changed.items():
+            token_versions.note(user_id, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_users", None)
+
+
+def get_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
     token = credentials.credentials
     
     try:
@@ -38,6 +109,13 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
+    return payload
+
+
+def _load_user_snapshot(db: Session, user_id: str) -> CurrentUser:
+    current_user = user_cache.get(user_id)
+    if current_user is not None:
+        return current_user
     
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
@@ -46,12 +124,47 @@ def get_current_user(
             detail="User not found"
         )
     
-    return user
+    current_user = CurrentUser.from_user(user)
+    user_cache.set(user_id, current_user)
+    return current_user
+
+
+def get_current_principal(
+    payload: dict = Depends(get_token_payload),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Authorize from the token's claims while its version is current."""
+    user_id = payload["sub"]
+    
+    if "ver" not in payload:
+        # Issued before tokens carried claims; fall back to the user row
+        snapshot = _load_user_snapshot(db, user_id)
+        return Principal(snapshot.id, snapshot.username, snapshot.is_active, snapshot.is_creator)
+    
+    if payload["ver"] < token_versions.current_version(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+    return Principal(
+        id=user_id,
+        username=payload["usr"],
+        is_active=payload["act"],
+        is_creator=payload["crt"],
+    )
+
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+) -> CurrentUser:
+    """Full snapshot of the caller, for endpoints that need more than the claims."""
+    return _load_user_snapshot(db, principal.id)
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_principal)
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,12 +173,38 @@ def get_current_active_user(
     return current_user
 
 
+def get_current_active_user_details(
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> CurrentUser:
+    """Full snapshot of an active caller."""
+    return _load_user_snapshot(db, current_user.id)
+
+
 def get_current_creator(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     if not current_user.is_creator:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a creator account"
         )
     return current_user
+
+
+def require_metrics_token(
+    x_metrics_token: Optional[str] = Header(None)
+) -> None:
+    # Runtime counters are for operators only; hide the endpoint when unset
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    if x_metrics_token is None or not secrets.compare_digest(
+        x_metrics_token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token"
+        )
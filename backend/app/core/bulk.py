@@ -0,0 +1,62 @@
+import csv
+import enum
+import io
+from datetime import date, datetime
+from typing import Iterable, List, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+
+# Marks NULL in COPY's CSV input, so empty strings stay empty strings
+_COPY_NULL = r"\N"
+
+
+def _copy_value(value):
+    if value is None:
+        return _COPY_NULL
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy's Enum type stores member names
+        return value.name
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _copy_rows(connection: Connection, table: Table, columns: Sequence[str], rows: Iterable[dict]):
+    """Load rows with COPY ... FROM STDIN through the psycopg2 cursor."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row.get(column)) for column in columns])
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    sql = (
+        f'COPY "{table.name}" ({column_list}) FROM STDIN '
+        f"WITH (FORMAT csv, NULL '{_COPY_NULL}')"
+    )
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+
+
+def insert_rows(connection: Connection, table: Table, rows: List[dict]):
+    """Insert a batch of rows in as few round trips as the database allows.
+
+    Uses COPY on PostgreSQL (psycopg2) and a single executemany elsewhere.
+    Runs inside the connection's current transaction. Columns left out of
+    the rows get their server defaults; Python-side defaults are not
+    applied, so callers must supply ids and other required values.
+    """
+    if not rows:
+        return
+
+    dialect = connection.dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        _copy_rows(connection, table, list(rows[0].keys()), rows)
+    else:
+        connection.execute(table.insert(), rows)
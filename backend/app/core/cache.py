@@ -0,0 +1,283 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStats:
+    """Counters for cache usage, kept per worker process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset_after_fork(self):
+        # The lock may have been held by another thread of the parent
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.sets = 0
+            self.invalidations = 0
+            self.expirations = 0
+            self.evictions = 0
+            self.errors = 0
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "sets": self.sets,
+                "invalidations": self.invalidations,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry TTL and LRU eviction.
+
+    Values are returned as stored, so callers must not mutate them.
+    """
+
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: float, max_entries: int, stats: Optional[CacheStats] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = stats or CacheStats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest first
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.stats.reset_after_fork()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.stats.incr("expirations")
+                entry = None
+            if entry is None:
+                self.stats.incr("misses")
+                return None
+            self._entries.move_to_end(key)
+        self.stats.incr("hits")
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        expires_at = time.monotonic() + (ttl_seconds or self.ttl_seconds)
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self.stats.incr("sets")
+        if evicted:
+            self.stats.incr("evictions", evicted)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            removed = sum(self._entries.pop(key, None) is not None for key in keys)
+        self.stats.incr("invalidations", removed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "backend": self.backend,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            **self.stats.snapshot(),
+        }
+
+
+class LocalSharedClient:
+    """In-process stand-in for the subset of the Redis client SharedCache uses.
+
+    Lets the shared backend run in tests and local setups without a server.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}  # key -> (expires_at, bytes)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None):
+        expires_at = time.monotonic() + ex if ex else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+
+    def dbsize(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SharedCache:
+    """Cache stored in Redis, shared by all workers and instances.
+
+    Values are JSON-encoded. Eviction is left to the server's maxmemory
+    policy; hits and misses are counted per worker. If the server is
+    unreachable, reads fall through to the database.
+    """
+
+    backend = "shared"
+
+    def __init__(self, client, ttl_seconds: float, prefix: str = "artison:", stats: Optional[CacheStats] = None):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.stats = stats or CacheStats()
+
+    def reset_after_fork(self):
+        self.stats.reset_after_fork()
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Cache get failed: {e}")
+            self.stats.incr("errors")
+            raw = None
+        if raw is None:
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = max(1, int(ttl_seconds or self.ttl_seconds))
+        try:
+            self.client.set(self.prefix + key, json.dumps(value).encode(), ex=ttl)
+        except Exception as e:
+            logger.warning(f"Cache set failed: {e}")
+            self.stats.incr("errors")
+            return
+        self.stats.incr("sets")
+
+    def delete(self, *keys: str):
+        try:
+            removed = self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            # Entries expire after the TTL anyway
+            logger.error(f"Cache invalidation failed for {keys}: {e}")
+            self.stats.incr("errors")
+            return
+        self.stats.incr("invalidations", removed)
+
+    def clear(self):
+        if isinstance(self.client, LocalSharedClient):
+            self.client.flushdb()
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": self.backend,
+            "ttl_seconds": self.ttl_seconds,
+            **self.stats.snapshot(),
+        }
+
+
+class NullCache:
+    """Cache that stores nothing, for CACHE_BACKEND=none."""
+
+    backend = "none"
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def reset_after_fork(self):
+        self.stats.reset_after_fork()
+
+    def get(self, key: str) -> Optional[Any]:
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        pass
+
+    def delete(self, *keys: str):
+        pass
+
+    def clear(self):
+        pass
+
+    def snapshot(self) -> dict:
+        return {"backend": self.backend, **self.stats.snapshot()}
+
+
+def _create_shared_client(url: str):
+    if url.startswith("local://"):
+        return LocalSharedClient()
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError("CACHE_BACKEND=redis requires the redis package") from e
+    return redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+
+def build_cache():
+    """Create the response cache selected by CACHE_BACKEND."""
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+    if settings.CACHE_BACKEND == "redis":
+        return SharedCache(_create_shared_client(settings.CACHE_URL), settings.CACHE_TTL_SECONDS)
+    if settings.CACHE_BACKEND == "memory":
+        return TTLCache(settings.CACHE_TTL_SECONDS, settings.CACHE_MAX_ENTRIES)
+    raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+
+
+cache = build_cache()
+
+
+def get_cache_stats() -> dict:
+    """Describe the response cache and its counters for /metrics."""
+    return cache.snapshot()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: cache.reset_after_fork())
@@ -9,9 +9,54 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing (pbkdf2_sha256); older hashes are upgraded on login
+    PASSWORD_HASH_ROUNDS: int = 29000
+    PASSWORD_HASH_WORKERS: int = 2  # concurrent hashes per worker process
+    PASSWORD_HASH_MAX_QUEUE: int = 8  # waiting beyond this returns 503
+    
+    # Runtime counters at GET /metrics, sent as the X-Metrics-Token header
+    # (empty = the endpoint answers 404)
+    METRICS_TOKEN: str = ""
+    
     # Database
     DATABASE_URL: str = "sqlite:///./artison.db"
     
+    # Connection pool ("queue" keeps a per-worker pool, "null" opens a
+    # connection per checkout for serverless deployments)
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    
+    # SQLite ("production" enables WAL, tuned pragmas and a serialized writer)
+    SQLITE_PROFILE: str = "default"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_CACHE_SIZE_KB: int = 65536  # 64 MiB
+    
+    # Read replica for read-only routes (empty = use the primary)
+    READ_DATABASE_URL: str = ""
+    READ_YOUR_WRITES_SECONDS: int = 5  # stick to the primary after a write
+    
+    # Async engine (asyncpg / aiosqlite) for the async routes' database steps;
+    # the URL is derived from DATABASE_URL when unset
+    DB_ASYNC_ENABLED: bool = False
+    ASYNC_DATABASE_URL: str = ""
+    
+    # Response cache for public pages ("memory" = per worker, "redis" =
+    # shared via CACHE_URL, "local://" for an in-process stand-in; "none")
+    CACHE_BACKEND: str = "memory"
+    CACHE_URL: str = ""
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 10000
+    
+    # Authenticated-user snapshots cached per worker by token subject
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_VERSION_REFRESH_SECONDS: int = 5  # how soon revocations reach other workers
+    
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:5173"]
     
@@ -23,6 +68,34 @@ class Settings(BaseSettings):
     STRIPE_PUBLISHABLE_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
     STRIPE_CONNECT_WEBHOOK_SECRET: str = ""
+    STRIPE_API_BASE: str = ""  # e.g. a local fake for load tests; empty = api.stripe.com
+    
+    # Stripe HTTP client (keep-alive pool per worker; only idempotent calls
+    # are retried; the breaker fails calls fast after consecutive outages)
+    STRIPE_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    STRIPE_READ_TIMEOUT_SECONDS: float = 20.0
+    STRIPE_POOL_SIZE: int = 32
+    STRIPE_EXECUTOR_WORKERS: int = 32  # threads per worker for Stripe calls awaited by async routes
+    STRIPE_MAX_RETRIES: int = 2
+    STRIPE_RETRY_BACKOFF_SECONDS: float = 0.25  # doubles per attempt, with full jitter
+    STRIPE_RETRY_BACKOFF_MAX_SECONDS: float = 2.0
+    STRIPE_BREAKER_FAILURES: int = 5
+    STRIPE_BREAKER_RESET_SECONDS: float = 30.0
+    STRIPE_LATENCY_SAMPLES: int = 1000  # recent calls kept per operation for percentiles
+    STRIPE_ACCOUNT_STATUS_MAX_AGE_SECONDS: float = 300.0  # older Connect flags are refreshed in the background
+    STRIPE_ACCOUNT_STATUS_REFRESH_CONCURRENCY: int = 4  # background refreshes at once per worker, below DB_POOL_SIZE
+    
+    # Webhook inbox (events are stored and acknowledged at once, then applied
+    # by a background worker in every API process)
+    WEBHOOK_WORKER_ENABLED: bool = True  # false when scripts/process_webhooks.py drains instead
+    WEBHOOK_WORKER_CONCURRENCY: int = 4  # events applied at once per process, one DB connection each
+    WEBHOOK_BATCH_SIZE: int = 50
+    WEBHOOK_POLL_SECONDS: float = 1.0
+    WEBHOOK_LEASE_SECONDS: float = 300.0  # a claimed event not finished by then is claimed again
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BACKOFF_SECONDS: float = 5.0  # doubles per attempt, with full jitter
+    WEBHOOK_RETRY_BACKOFF_MAX_SECONDS: float = 900.0
+    WEBHOOK_COALESCE_SECONDS: float = 5.0  # account.updated bursts per account are applied once, this long after the first
     
     # Support settings
     MINIMUM_SUPPORT_AMOUNT: int = 150  # 150 yen
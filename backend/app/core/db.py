@@ -1,38 +1,377 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from typing import Awaitable, Callable, Optional
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool, QueuePool
 from app.core.config import settings
+from app.core.cache import build_cache
+import jwt
 import logging
+import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-# Connection arguments for PostgreSQL
-connect_args = {}
-engine_args = {}
-
-if settings.DATABASE_URL.startswith("postgresql"):
-    # Use NullPool for serverless environments
-    engine_args["poolclass"] = NullPool
-    connect_args = {
-        "connect_timeout": 10,
-        "options": "-c statement_timeout=30000"
-    }
-else:
-    # SQLite doesn't need special handling
-    pass
+
+class PoolStats:
+    """Counters for connection pool usage, kept per worker process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset_after_fork(self):
+        # The lock may have been held by another thread of the parent
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.waits = 0
+            self.timeouts = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.waits += 1
+            if timed_out:
+                self.timeouts += 1
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how often and how long checkouts wait."""
+
+    stats = None  # set on the per-engine subclass created by _build_engine_args
+
+    def _do_get(self):
+        # A checkout has to wait when nothing is idle and overflow is used up
+        must_wait = (
+            self._pool.empty()
+            and self._max_overflow > -1
+            and self._overflow >= self._max_overflow
+        )
+        if not must_wait:
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def _build_engine_args(url: str, stats: PoolStats) -> tuple:
+    """Return (connect_args, engine_args) for a database URL."""
+    connect_args = {}
+    engine_args = {}
+
+    if url.startswith("postgresql"):
+        # UTC sessions: naive datetime.utcnow() values round-trip unchanged
+        # and date() buckets match the Python-side completed_at.date()
+        connect_args = {
+            "connect_timeout": 10,
+            "options": "-c statement_timeout=30000 -c timezone=UTC"
+        }
+        if settings.DB_POOL_MODE == "null":
+            # Serverless: no connection outlives the request
+            engine_args["poolclass"] = NullPool
+        elif settings.DB_POOL_MODE == "queue":
+            engine_args.update(
+                poolclass=type(
+                    "InstrumentedQueuePool", (InstrumentedQueuePool,), {"stats": stats}
+                ),
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=settings.DB_POOL_PRE_PING,
+            )
+        else:
+            raise ValueError(f"Unknown DB_POOL_MODE: {settings.DB_POOL_MODE}")
+    elif url.startswith("sqlite") and settings.SQLITE_PROFILE == "production":
+        # Connections are shared across threadpool workers
+        connect_args = {"check_same_thread": False}
+    else:
+        # SQLite doesn't need special handling
+        pass
+
+    return connect_args, engine_args
+
+
+def _use_sqlite_production_profile(url: str) -> bool:
+    if not url.startswith("sqlite"):
+        return False
+    if settings.SQLITE_PROFILE not in ("default", "production"):
+        raise ValueError(f"Unknown SQLITE_PROFILE: {settings.SQLITE_PROFILE}")
+    return settings.SQLITE_PROFILE == "production"
+
+
+def configure_sqlite_connection(dbapi_connection, connection_record=None):
+    """Apply the production pragmas to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers keep working while a write is in progress
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.close()
+
+
+class SQLiteWriteSerializer:
+    """Lets one session at a time hold a write transaction in this process.
+
+    SQLite allows a single writer per database. Queuing writers on a lock
+    here, instead of letting them race for the database lock, removes
+    "database is locked" errors between threads; busy_timeout still covers
+    writers in other processes. The lock is taken on the first flush or
+    bulk INSERT/UPDATE/DELETE and released when the transaction ends.
+    """
+
+    def __init__(self, timeout: float):
+        self._lock = threading.Lock()
+        self._timeout = timeout
+
+    def install(self, session_factory):
+        event.listen(session_factory, "before_flush", self._before_flush)
+        event.listen(session_factory, "do_orm_execute", self._before_execute)
+        event.listen(session_factory, "after_transaction_end", self._after_transaction_end)
+
+    def _acquire(self, session):
+        if session.info.get("sqlite_write_lock"):
+            return
+        if self._lock.acquire(timeout=self._timeout):
+            session.info["sqlite_write_lock"] = True
+        else:
+            logger.warning("SQLite writer queue timed out; relying on busy_timeout")
+
+    def _before_flush(self, session, flush_context, instances):
+        if session.new or session.dirty or session.deleted:
+            self._acquire(session)
+
+    def _before_execute(self, orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            self._acquire(orm_execute_state.session)
+
+    def _after_transaction_end(self, session, transaction):
+        if transaction.parent is None and session.info.pop("sqlite_write_lock", False):
+            self._lock.release()
+
+
+def _create_engine(url: str, stats: PoolStats):
+    """Create an engine whose pool events are counted in stats."""
+    connect_args, engine_args = _build_engine_args(url, stats)
+    target_engine = create_engine(url, connect_args=connect_args, **engine_args)
+    if _use_sqlite_production_profile(url):
+        event.listen(target_engine, "connect", configure_sqlite_connection)
+
+    event.listen(target_engine, "connect", lambda *args: stats.incr("connects"))
+    event.listen(target_engine, "checkout", lambda *args: stats.incr("checkouts"))
+    event.listen(target_engine, "checkin", lambda *args: stats.incr("checkins"))
+    event.listen(target_engine, "invalidate", lambda *args: stats.incr("invalidations"))
+    return target_engine
+
 
 # Create engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args=connect_args,
-    **engine_args
-)
+pool_stats = PoolStats()
+engine = _create_engine(settings.DATABASE_URL, pool_stats)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if _use_sqlite_production_profile(settings.DATABASE_URL):
+    SQLiteWriteSerializer(settings.SQLITE_BUSY_TIMEOUT_MS / 1000).install(SessionLocal)
+
+# Read replica for read-only routes; falls back to the primary when unset
+read_pool_stats = PoolStats()
+read_engine = engine
+ReadSessionLocal = SessionLocal
+
+if settings.READ_DATABASE_URL:
+    read_engine = _create_engine(settings.READ_DATABASE_URL, read_pool_stats)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 Base = declarative_base()
 
 
+def get_async_database_url(url: Optional[str] = None) -> str:
+    """Return the async driver URL for `url`, by default the configured database."""
+    if url is None:
+        if settings.ASYNC_DATABASE_URL:
+            return settings.ASYNC_DATABASE_URL
+        url = settings.DATABASE_URL
+    if url.startswith("postgresql"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    raise ValueError(f"No async driver known for {url.split('://', 1)[0]}")
+
+
+def _build_async_engine():
+    """Create the optional async engine with the same pool settings."""
+    url = get_async_database_url()
+    connect_args = {}
+    engine_args = {}
+
+    if url.startswith("postgresql"):
+        connect_args = {
+            "timeout": 10,
+            "server_settings": {"statement_timeout": "30000", "timezone": "UTC"},
+        }
+        if settings.DB_POOL_MODE == "null":
+            engine_args["poolclass"] = NullPool
+        else:
+            engine_args.update(
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=settings.DB_POOL_PRE_PING,
+            )
+
+    target_engine = create_async_engine(url, connect_args=connect_args, **engine_args)
+    if _use_sqlite_production_profile(url):
+        event.listen(target_engine.sync_engine, "connect", configure_sqlite_connection)
+    return target_engine
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC_ENABLED:
+    async_engine = _build_async_engine()
+    # Objects stay usable after commit; lazy loads are not possible on AsyncSession
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+def _dispose_pool_after_fork():
+    # Connections inherited from a preloading parent must not be shared
+    # with it; drop them without closing the parent's sockets.
+    engine.dispose(close=False)
+    pool_stats.reset_after_fork()
+    if read_engine is not engine:
+        read_engine.dispose(close=False)
+        read_pool_stats.reset_after_fork()
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_pool_after_fork)
+
+
+def _describe_pool(target_engine, stats: PoolStats) -> dict:
+    snapshot = stats.snapshot()
+    pool = target_engine.pool
+    snapshot["pool_class"] = type(pool).__name__
+    if isinstance(pool, QueuePool):
+        snapshot.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    return snapshot
+
+
+def get_pool_stats() -> dict:
+    """Return pool counters and current occupancy for this worker."""
+    return _describe_pool(engine, pool_stats)
+
+
+def get_read_pool_stats() -> Optional[dict]:
+    """Return read replica pool counters, or None without a replica."""
+    if read_engine is engine:
+        return None
+    return _describe_pool(read_engine, read_pool_stats)
+
+
+# Read-your-writes: after a successful mutation the caller is pinned to the
+# primary for READ_YOUR_WRITES_SECONDS. The deadline is returned in the
+# X-Primary-Until header for clients to echo back, and kept per user in the
+# cache backend, which every worker sees with CACHE_BACKEND=redis.
+PRIMARY_STICKY_HEADER = "X-Primary-Until"
+_MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+_sticky_users = build_cache()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _sticky_users.reset_after_fork())
+
+
+def _caller_id(request: Request) -> Optional[str]:
+    """User id from a valid bearer token, without touching the database."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+    return payload.get("sub")
+
+
+def _sticky_key(user_id: str) -> str:
+    return f"primary_until:{user_id}"
+
+
+def mark_primary_sticky(request: Request, response: Response):
+    """Pin the caller to the primary after a successful write."""
+    if read_engine is engine:
+        return
+    if request.method not in _MUTATING_METHODS or response.status_code >= 400:
+        return
+
+    window = settings.READ_YOUR_WRITES_SECONDS
+    until = int(time.time() + window) + 1
+    response.headers[PRIMARY_STICKY_HEADER] = str(until)
+
+    user_id = _caller_id(request)
+    if user_id:
+        _sticky_users.set(_sticky_key(user_id), until, ttl_seconds=window)
+
+
+def is_primary_sticky(request: Request) -> bool:
+    """Whether reads for this caller must still go to the primary."""
+    now = time.time()
+    echoed = request.headers.get(PRIMARY_STICKY_HEADER)
+    if echoed and echoed.isdigit() and int(echoed) > now:
+        return True
+    user_id = _caller_id(request)
+    return bool(user_id) and (_sticky_users.get(_sticky_key(user_id)) or 0) > now
+
+
 def get_db():
     """Get database session."""
     db = SessionLocal()
@@ -44,3 +383,60 @@ def get_db():
         raise
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """Get a session for read-only work, served by the replica when possible."""
+    if read_engine is engine or is_primary_sticky(request):
+        session_factory = SessionLocal
+    else:
+        session_factory = ReadSessionLocal
+
+    db = session_factory()
+    try:
+        yield db
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# run_db(fn, *args) awaits fn(session, *args) run off the event loop
+DbRunner = Callable[..., Awaitable]
+
+
+def threadpool_runner(db: Session) -> DbRunner:
+    """Return run_db(fn, *args), running fn(db, *args) in the threadpool."""
+    async def run_db(fn, *args):
+        return await run_in_threadpool(fn, db, *args)
+    return run_db
+
+
+async def get_db_runner():
+    """Get run_db(fn, *args) for async routes.
+
+    Each call runs fn(session, *args) off the event loop as its own short
+    transaction: on the async engine with DB_ASYNC_ENABLED, otherwise on a
+    pooled sync session in the threadpool.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            try:
+                yield db.run_sync
+            except Exception as e:
+                logger.error(f"Database error: {e}")
+                await db.rollback()
+                raise
+        return
+
+    db = SessionLocal()
+    try:
+        yield threadpool_runner(db)
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        await run_in_threadpool(db.rollback)
+        raise
+    finally:
+        await run_in_threadpool(db.close)
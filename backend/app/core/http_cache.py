@@ -0,0 +1,143 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, NamedTuple, Optional
+
+from fastapi import Request, Response, status
+
+from app.core.cache import cache
+from app.core.config import settings
+
+# Written over an invalidated entry while replicas may still serve the old
+# version; readers treat it as a miss and do not cache what they build
+_HOLD = {"hold": True}
+
+
+class Validators(NamedTuple):
+    """ETag and Last-Modified for one version of a resource."""
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def make_validators(*version_parts, last_modified: Optional[datetime] = None) -> Validators:
+    """Build a strong ETag from the parts that identify a resource version."""
+    digest = hashlib.sha256(repr(version_parts).encode()).hexdigest()[:32]
+    return Validators(f'"{digest}"', _as_utc(last_modified))
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    """Return the newest of the given timestamps, ignoring missing ones."""
+    present = [_as_utc(ts) for ts in timestamps if ts is not None]
+    return max(present) if present else None
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    # SQLite hands back naive datetimes; they are stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """Check the request's conditional headers against the current version."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, validators.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return validators.last_modified <= since
+    return False
+
+
+def apply_validators(response: Response, validators: Validators):
+    """Set ETag, Last-Modified and a revalidate-every-time Cache-Control."""
+    response.headers["ETag"] = validators.etag
+    if validators.last_modified:
+        response.headers["Last-Modified"] = format_datetime(validators.last_modified, usegmt=True)
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def not_modified(validators: Validators) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    apply_validators(response, validators)
+    return response
+
+
+def invalidate(*cache_keys: str):
+    """Drop cached entries after a committed write.
+
+    With a read replica, a miss right after the write could be refilled from
+    a replica that has not caught up and then served for the whole TTL, so
+    the entries are held uncached for READ_YOUR_WRITES_SECONDS instead.
+    """
+    if not settings.READ_DATABASE_URL:
+        cache.delete(*cache_keys)
+        return
+    for cache_key in cache_keys:
+        cache.set(cache_key, _HOLD, ttl_seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    cache_key: str,
+    probe: Callable[[], Optional[Validators]],
+    build: Callable[[], Any]
+) -> Any:
+    """Serve a cached, conditionally requested resource.
+
+    The payload is cached together with its validators, so a cache hit
+    answers without touching the database. On a miss, the cheap probe
+    decides whether a 304 is enough before the payload is built. When the
+    probe finds nothing, build() decides how to report the missing resource.
+    """
+    entry = cache.get(cache_key)
+    held = entry == _HOLD
+    if held:
+        entry = None
+    if entry is not None:
+        validators = Validators(
+            entry["etag"],
+            datetime.fromisoformat(entry["last_modified"]) if entry["last_modified"] else None
+        )
+    else:
+        validators = probe()
+        if validators is None:
+            return build()
+
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+
+    if entry is not None:
+        body = entry["body"]
+    else:
+        # Built after probing, so the body is never older than its ETag
+        body = build()
+        if body is None:
+            return None
+        if not held:
+            cache.set(cache_key, {
+                "etag": validators.etag,
+                "last_modified": validators.last_modified.isoformat() if validators.last_modified else None,
+                "body": body,
+            })
+
+    apply_validators(response, validators)
+    return body
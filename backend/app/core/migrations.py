@@ -0,0 +1,21 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def get_alembic_config() -> Config:
+    """Alembic config that works from any working directory."""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+
+def run_migrations(revision: str = "head"):
+    """Upgrade the database schema.
+
+    Run this once per release (scripts/migrate.py), never from the API
+    workers; on PostgreSQL concurrent runs serialize on an advisory lock.
+    """
+    command.upgrade(get_alembic_config(), revision)
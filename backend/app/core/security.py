@@ -1,10 +1,142 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
+import os
+import threading
+import time
 import jwt
-from passlib.hash import pbkdf2_sha256
+from passlib.context import CryptContext
 
 from app.core.config import settings
 
+# Hashes with any other round count are upgraded on the next login
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when every hashing slot and queue position is taken."""
+
+
+class PasswordHasher:
+    """Runs password hashing on a small dedicated pool with admission control.
+
+    At most `workers` hashes run at once and `max_queue` more may wait;
+    anything beyond that fails fast with PasswordHasherBusy, so a burst of
+    logins cannot occupy every request thread. pbkdf2 releases the GIL, so
+    the threads hash in parallel. The *_async methods await the same pool
+    without blocking the event loop.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_queue: int):
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._executor = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.hash_time_total = 0.0
+
+    def reset_after_fork(self):
+        # The parent's pool threads do not exist in the child
+        self._reset()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+            return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Password hashing is at capacity")
+        
+        submitted = time.perf_counter()
+        
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.wait_time_total += started - submitted
+                    self.hash_time_total += time.perf_counter() - started
+        
+        def finished(future):
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+            self._slots.release()
+        
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._get_executor().submit(timed)
+        except BaseException:
+            finished(None)
+            raise
+        future.add_done_callback(finished)
+        return future
+
+    def _run(self, fn, *args):
+        return self._submit(fn, *args).result()
+
+    async def _run_async(self, fn, *args):
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def hash(self, password: str) -> str:
+        return self._run(self.context.hash, password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._run(self.context.verify, password, hashed_password)
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return self._run(self.context.verify_and_update, password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(self.context.hash, password)
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run_async(self.context.verify_and_update, password, hashed_password)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "rounds": settings.PASSWORD_HASH_ROUNDS,
+                "in_flight": self.in_flight,
+                "completed": completed,
+                "rejected": self.rejected,
+                "wait_time_avg_ms": round(self.wait_time_total * 1000 / completed, 3) if completed else None,
+                "hash_time_avg_ms": round(self.hash_time_total * 1000 / completed, 3) if completed else None,
+            }
+
+
+password_hasher = PasswordHasher(
+    pwd_context, settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=password_hasher.reset_after_fork)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -26,8 +158,13 @@ def verify_token(token: str) -> Optional[dict]:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pbkdf2_sha256.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also return a new hash if the stored one is outdated."""
+    return password_hasher.verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pbkdf2_sha256.hash(password)
+    return password_hasher.hash(password)
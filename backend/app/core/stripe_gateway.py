@@ -0,0 +1,288 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+import asyncio
+import functools
+import math
+import os
+import random
+import threading
+import time
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+import stripe
+
+from app.core.config import settings
+
+
+class StripeUnavailable(stripe.error.APIConnectionError):
+    """Raised without calling Stripe while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures.
+
+    While open every call is rejected; after `reset_seconds` one trial call
+    is let through (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            # A trial that never reports back is replaced after another period
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self.opened_at = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+class OperationStats:
+    """Counters and recent latencies for one kind of Stripe call."""
+
+    def __init__(self, samples: int):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=samples)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def percentile(pct: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1] * 1000, 3)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+        }
+
+
+def _is_retryable(error: stripe.error.StripeError) -> bool:
+    # Network failures, timeouts, rate limiting and 5xx responses
+    if isinstance(error, (stripe.error.APIConnectionError, stripe.error.RateLimitError)):
+        return not isinstance(error, StripeUnavailable)
+    return isinstance(error, stripe.error.APIError) and (error.http_status or 500) >= 500
+
+
+def _is_outage(error: stripe.error.StripeError) -> bool:
+    # Counts against the breaker; 4xx answers mean Stripe itself is fine
+    if isinstance(error, stripe.error.APIConnectionError):
+        return True
+    return isinstance(error, stripe.error.APIError) and (error.http_status or 500) >= 500
+
+
+class StripeGateway:
+    """The one place the backend talks to Stripe.
+
+    Owns the SDK configuration and a keep-alive connection pool with
+    explicit timeouts. Calls marked idempotent (reads, and writes sent with
+    an idempotency key) are retried with jittered exponential backoff, and
+    a circuit breaker fails every call fast while Stripe keeps failing.
+    Latencies and outcomes are recorded per operation for /metrics.
+
+    The SDK is blocking; async callers await `run_async`, which runs calls on
+    the gateway's own threads so the event loop and request threadpool stay free.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self.breaker = CircuitBreaker(settings.STRIPE_BREAKER_FAILURES, settings.STRIPE_BREAKER_RESET_SECONDS)
+        self._operations = {}
+        self._executor = None
+        self._in_flight = 0
+        self.install()
+
+    def reset_after_fork(self):
+        # Pooled sockets and executor threads belong to the parent process
+        self._reset()
+
+    def install(self):
+        """Point the stripe module at this gateway's settings and pool."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.STRIPE_POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        stripe.api_key = settings.STRIPE_SECRET_KEY
+        if settings.STRIPE_API_BASE:
+            stripe.api_base = settings.STRIPE_API_BASE
+        # Retries happen here, where the breaker and metrics can see them
+        stripe.max_network_retries = 0
+        stripe.default_http_client = stripe.http_client.RequestsClient(
+            timeout=(settings.STRIPE_CONNECT_TIMEOUT_SECONDS, settings.STRIPE_READ_TIMEOUT_SECONDS),
+            session=session,
+        )
+
+    def _stats(self, operation: str) -> OperationStats:
+        stats = self._operations.get(operation)
+        if stats is None:
+            with self._lock:
+                stats = self._operations.setdefault(operation, OperationStats(settings.STRIPE_LATENCY_SAMPLES))
+        return stats
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: anywhere up to the exponential bound
+        bound = settings.STRIPE_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+        return random.uniform(0, min(bound, settings.STRIPE_RETRY_BACKOFF_MAX_SECONDS))
+
+    def call(self, operation: str, fn: Callable, *args, idempotent: bool = False, **kwargs):
+        """Run one SDK call through the breaker, retries and metrics."""
+        stats = self._stats(operation)
+        attempts = 1 + (settings.STRIPE_MAX_RETRIES if idempotent else 0)
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                with self._lock:
+                    stats.errors += 1
+                raise StripeUnavailable("Stripe is unavailable; failing fast while the circuit is open")
+
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except stripe.error.StripeError as e:
+                elapsed = time.perf_counter() - started
+                if _is_outage(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                retry = attempt + 1 < attempts and _is_retryable(e)
+                with self._lock:
+                    stats.calls += 1
+                    stats.latencies.append(elapsed)
+                    if retry:
+                        stats.retries += 1
+                    else:
+                        stats.errors += 1
+                if not retry:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self.breaker.record_success()
+            with self._lock:
+                stats.calls += 1
+                stats.latencies.append(time.perf_counter() - started)
+            return result
+
+    def _executor_for_calls(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.STRIPE_EXECUTOR_WORKERS, thread_name_prefix="stripe"
+                    )
+        return self._executor
+
+    async def run_async(self, method: Callable, *args, **kwargs):
+        """Await one of the gateway methods below without blocking the event loop."""
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor_for_calls(), functools.partial(method, *args, **kwargs)
+            )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run work that calls the gateway on its threads, without waiting for it."""
+        return self._executor_for_calls().submit(fn, *args, **kwargs)
+
+    # Operations used by the domains
+
+    def create_checkout_session(self, idempotency_key: str, **params):
+        return self.call(
+            "checkout.sessions.create", stripe.checkout.Session.create,
+            idempotent=True, idempotency_key=idempotency_key, **params
+        )
+
+    def create_account(self, idempotency_key: str, **params):
+        return self.call(
+            "accounts.create", stripe.Account.create,
+            idempotent=True, idempotency_key=idempotency_key, **params
+        )
+
+    def retrieve_account(self, account_id: str):
+        return self.call("accounts.retrieve", stripe.Account.retrieve, account_id, idempotent=True)
+
+    def modify_account(self, account_id: str, **params):
+        return self.call(
+            "accounts.modify", stripe.Account.modify, account_id,
+            idempotent=True, idempotency_key=str(uuid.uuid4()), **params
+        )
+
+    def create_account_link(self, **params):
+        return self.call(
+            "account_links.create", stripe.AccountLink.create,
+            idempotent=True, idempotency_key=str(uuid.uuid4()), **params
+        )
+
+    def construct_event(self, payload: bytes, sig_header: str, secret: str):
+        """Verify a webhook signature and parse the event (no network call)."""
+        return stripe.Webhook.construct_event(payload, sig_header, secret)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            operations = {name: stats.snapshot() for name, stats in self._operations.items()}
+            in_flight = self._in_flight
+        return {
+            "breaker": self.breaker.snapshot(),
+            "pool_size": settings.STRIPE_POOL_SIZE,
+            "executor_workers": settings.STRIPE_EXECUTOR_WORKERS,
+            "async_in_flight": in_flight,
+            "operations": operations,
+        }
+
+
+stripe_gateway = StripeGateway()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=stripe_gateway.reset_after_fork)
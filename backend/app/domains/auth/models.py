@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Index, event, inspect, text
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -15,5 +15,25 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_creator = Column(Boolean, default=False)
+    # Bumped whenever is_active/is_creator change; tokens carrying an older
+    # version are rejected, see app/domains/auth/token_versions.py
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        # Workers reload bumped versions every TOKEN_VERSION_REFRESH_SECONDS;
+        # only those few rows are indexed, so the reload never scans users
+        Index(
+            "ix_users_token_version_bumped", "id", "token_version",
+            postgresql_where=text("token_version > 0"),
+            sqlite_where=text("token_version > 0"),
+        ),
+    )
+
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.is_active.history.has_changes() or state.attrs.is_creator.history.has_changes():
+        target.token_version = (target.token_version or 0) + 1
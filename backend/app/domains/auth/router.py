@@ -1,50 +1,64 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
-from app.core.db import get_db
-from app.api.deps import get_current_active_user
+from app.core.db import DbRunner, get_db_runner
+from app.core.security import PasswordHasherBusy
+from app.api.deps import CurrentUser, get_current_active_user_details
 from app.domains.auth import schemas, service
-from app.domains.auth.models import User
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts in progress, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
 @router.post("/register", response_model=schemas.User)
-def register(
+async def register(
     user_data: schemas.UserCreate,
-    db: Session = Depends(get_db)
+    run_db: DbRunner = Depends(get_db_runner)
 ):
+    # Hashing is awaited between short transactions, holding neither a
+    # thread nor a connection
     try:
-        return service.create_user(db=db, user_create=user_data)
+        return await service.create_user_async(user_data, run_db)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PasswordHasherBusy:
+        raise _hasher_busy()
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
     credentials: schemas.UserLogin,  # LoginCredentials -> UserLogin
-    db: Session = Depends(get_db)
+    run_db: DbRunner = Depends(get_db_runner)
 ):
-    user = service.authenticate_user(
-        db, 
-        email=credentials.email, 
-        password=credentials.password
-    )
+    try:
+        user = await service.authenticate_user_async(
+            credentials.email,
+            credentials.password,
+            run_db
+        )
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
     
-    access_token = service.create_token(user.id)
+    access_token = service.create_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=schemas.User)
 def get_current_user(
-    current_user: User = Depends(get_current_active_user)
+    current_user: CurrentUser = Depends(get_current_active_user_details)
 ):
     return current_user
@@ -1,11 +1,15 @@
 from datetime import timedelta
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 import jwt
 import re
 
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.core.security import (
+    create_access_token, verify_and_update_password, get_password_hash, password_hasher
+)
 from app.domains.auth.models import User
 from app.domains.auth.schemas import UserCreate
 
@@ -23,59 +27,200 @@ def generate_username_from_email(email: str) -> str:
     return base_username.lower()
 
 
+# Registrations racing for the same generated name retry this many times
+USERNAME_ALLOCATION_ATTEMPTS = 5
+
+# Bases looked up per query when allocating names in bulk
+USERNAME_LOOKUP_CHUNK = 400
+
+
+def taken_username_suffixes_many(db: Session, base_usernames: Iterable[str]) -> Dict[str, set]:
+    """Get {base: numeric suffixes in use after it ("" for the bare name)}.
+
+    Generated names are lowercase alphanumerics, so every candidate sorts
+    between base and base + "a": one index range scan per base, OR-ed
+    together in a query per USERNAME_LOOKUP_CHUNK bases.
+    """
+    taken = {base: set() for base in base_usernames}
+    bases = list(taken)
+    for start in range(0, len(bases), USERNAME_LOOKUP_CHUNK):
+        ranges = [
+            and_(User.username >= base, User.username < base + "a")
+            for base in bases[start:start + USERNAME_LOOKUP_CHUNK]
+        ]
+        for (name,) in db.query(User.username).filter(or_(*ranges)):
+            # "info12" is suffix "12" of "info", "2" of "info1" and "" of itself
+            digits_start = len(name[::-1].lstrip("0123456789"))
+            for cut in range(digits_start, len(name) + 1):
+                if name[:cut] in taken:
+                    taken[name[:cut]].add(name[cut:])
+    return taken
+
+
+def taken_username_suffixes(db: Session, base_username: str) -> set:
+    """Get the numeric suffixes in use after base_username ("" for the bare name)."""
+    return taken_username_suffixes_many(db, [base_username])[base_username]
+
+
+def first_free_username(base_username: str, taken_suffixes: set) -> str:
+    """Return base_username or base_username<N> with the lowest free N."""
+    if "" not in taken_suffixes:
+        return base_username
+    counter = 1
+    while str(counter) in taken_suffixes:
+        counter += 1
+    return f"{base_username}{counter}"
+
+
+def allocate_username(db: Session, base_username: str) -> str:
+    """Pick base_username or the lowest free base_username<N> in one query.
+
+    A concurrent registration can still take the name first; create_user
+    retries on the unique constraint.
+    """
+    return first_free_username(base_username, taken_username_suffixes(db, base_username))
+
+
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+def find_user_for_login(db: Session, email: str) -> Optional[User]:
+    """Load a user for a password check and end the read transaction.
+
+    The user is detached, so no connection is held while the password is
+    verified.
+    """
+    user = get_user_by_email(db, email)
+    if user:
+        db.expunge(user)
+    db.rollback()
+    return user
+
+
+def store_upgraded_hash(db: Session, user: User, new_hash: Optional[str]) -> User:
+    """Save a rehashed password returned by verify_and_update, if any."""
+    if new_hash:
+        # Stored with outdated parameters (e.g. PASSWORD_HASH_ROUNDS changed)
+        db.query(User).filter(User.id == user.id).update(
+            {User.hashed_password: new_hash}, synchronize_session=False
+        )
+        db.commit()
+        user.hashed_password = new_hash
+    return user
+
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authenticate a user by email and password."""
-    user = db.query(User).filter(User.email == email).first()
+    user = find_user_for_login(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return None
-    return user
+    return store_upgraded_hash(db, user, new_hash)
+
+
+def check_new_user(db: Session, user_create: UserCreate) -> None:
+    """Raise ValueError if the email or requested username is taken.
+
+    Ends the read transaction, so no connection is held while the password
+    is hashed.
+    """
+    try:
+        # Check if user already exists
+        if db.query(User).filter(User.email == user_create.email).first():
+            raise ValueError("Email already registered")
+        
+        # Check if provided username is already taken
+        if user_create.username and db.query(User).filter(User.username == user_create.username).first():
+            raise ValueError("Username already taken")
+    finally:
+        db.rollback()
 
 
 def create_user(db: Session, user_create: UserCreate) -> User:
     """Create a new user."""
-    # Check if user already exists
-    if db.query(User).filter(User.email == user_create.email).first():
-        raise ValueError("Email already registered")
-    
-    # Generate username if not provided
-    if not user_create.username:
-        base_username = generate_username_from_email(user_create.email)
-        username = base_username
-        counter = 1
+    check_new_user(db, user_create)
+    return insert_user(db, user_create, get_password_hash(user_create.password))
+
+
+async def authenticate_user_async(
+    email: str,
+    password: str,
+    run_db: Callable[..., Awaitable]
+) -> Optional[User]:
+    """Authenticate a user, awaiting the password check between short transactions.
+
+    `run_db(fn, *args)` runs `fn(session, *args)` off the event loop, as in
+    support's open_checkout_session.
+    """
+    user = await run_db(find_user_for_login, email)
+    if not user:
+        return None
+    verified, new_hash = await password_hasher.verify_and_update_async(password, user.hashed_password)
+    if not verified:
+        return None
+    return await run_db(store_upgraded_hash, user, new_hash)
+
+
+async def create_user_async(user_create: UserCreate, run_db: Callable[..., Awaitable]) -> User:
+    """Create a new user, hashing the password with no transaction open."""
+    await run_db(check_new_user, user_create)
+    hashed_password = await password_hasher.hash_async(user_create.password)
+    return await run_db(insert_user, user_create, hashed_password)
+
+
+def insert_user(db: Session, user_create: UserCreate, hashed_password: str) -> User:
+    """Insert a user whose password is already hashed, allocating a username."""
+    for _ in range(USERNAME_ALLOCATION_ATTEMPTS):
+        # Generate username if not provided
+        username = user_create.username or allocate_username(
+            db, generate_username_from_email(user_create.email)
+        )
         
-        # Ensure username is unique
-        while db.query(User).filter(User.username == username).first():
-            username = f"{base_username}{counter}"
-            counter += 1
+        # Create new user
+        db_user = User(
+            email=user_create.email,
+            username=username,
+            hashed_password=hashed_password,
+            is_creator=user_create.is_creator
+        )
         
-        user_create.username = username
-    else:
-        # Check if provided username is already taken
-        if db.query(User).filter(User.username == user_create.username).first():
-            raise ValueError("Username already taken")
-    
-    # Create new user
-    db_user = User(
-        email=user_create.email,
-        username=user_create.username,
-        hashed_password=get_password_hash(user_create.password),
-        is_creator=user_create.is_creator
-    )
-    
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+        db.add(db_user)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent registration
+            db.rollback()
+            if db.query(User.id).filter(User.email == user_create.email).first():
+                raise ValueError("Email already registered")
+            if user_create.username:
+                raise ValueError("Username already taken")
+            continue
+        
+        db.refresh(db_user)
+        return db_user
     
-    return db_user
+    raise ValueError("Could not allocate a username, please try again")
+
 
+def create_token(user: User) -> str:
+    """Create access token for user.
 
-def create_token(user_id: str) -> str:
-    """Create access token for user."""
+    Besides sub, the token carries the claims needed to authorize requests
+    without loading the user: usr (username), act (is_active), crt
+    (is_creator) and ver (token version).
+    """
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user_id}, 
+        data={
+            "sub": user.id,
+            "usr": user.username,
+            "act": bool(user.is_active),
+            "crt": bool(user.is_creator),
+            "ver": user.token_version or 0,
+        }, 
         expires_delta=access_token_expires
     )
     return access_token
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.domains.auth.models import User
+
+
+class TokenVersionTable:
+    """Per-worker map of user id -> current token version.
+
+    Only users whose version was ever bumped (deactivated, demoted, ...) are
+    listed, so the table stays tiny and is reloaded in one query every
+    TOKEN_VERSION_REFRESH_SECONDS. Everyone else is at version 0.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._loaded_at: Optional[float] = None
+        self.refreshes = 0
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._loaded_at = None
+        self.refreshes = 0
+
+    def _refresh(self, db: Session):
+        rows = db.query(User.id, User.token_version).filter(User.token_version > 0).all()
+        self._versions = {user_id: version for user_id, version in rows}
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    def _maybe_refresh(self, db: Session):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds:
+            return
+        # Until the first load every caller must wait; after that one thread
+        # refreshes while the others keep using the previous table
+        if not self._lock.acquire(blocking=loaded_at is None):
+            return
+        try:
+            if self._loaded_at == loaded_at:
+                self._refresh(db)
+        finally:
+            self._lock.release()
+
+    def current_version(self, db: Session, user_id: str) -> int:
+        self._maybe_refresh(db)
+        return self._versions.get(user_id, 0)
+
+    def note(self, user_id: str, version: int):
+        """Record a version committed by this worker without waiting for a refresh."""
+        with self._lock:
+            versions = dict(self._versions)
+            versions[user_id] = max(version, versions.get(user_id, 0))
+            self._versions = versions
+
+    def snapshot(self) -> dict:
+        loaded_at = self._loaded_at
+        return {
+            "entries": len(self._versions),
+            "refreshes": self.refreshes,
+            "age_seconds": round(time.monotonic() - loaded_at, 3) if loaded_at is not None else None,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+token_versions = TokenVersionTable(settings.TOKEN_VERSION_REFRESH_SECONDS)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: token_versions.reset_after_fork())
@@ -1,12 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
 
-from app.core.db import get_db
-from app.api.deps import get_current_active_user
-from app.domains.auth.models import User
+from app.core.db import get_db, get_read_db
+from app.core.http_cache import conditional_get
+from app.api.deps import Principal, get_current_active_user
 from app.domains.creator import schemas, service
-from app.domains.creator.models import CreatorProfile, PlatformLink
+from app.domains.creator.models import PlatformLink
 
 router = APIRouter(prefix="/creators", tags=["Creators"])
 
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/creators", tags=["Creators"])
 def create_profile(
     profile_data: schemas.CreatorProfileCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Create a creator profile for the current user."""
     return service.create_creator_profile(db, current_user.id, profile_data)
@@ -23,8 +23,8 @@ def create_profile(
 
 @router.get("/profile/me", response_model=schemas.CreatorProfile)
 def get_my_profile(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get the current user's creator profile."""
     profile = service.get_creator_profile_by_user_id(db, current_user.id)
@@ -39,61 +39,23 @@ def get_my_profile(
 @router.get("/profile/{username}", response_model=schemas.CreatorProfilePublic)
 def get_public_profile(
     username: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
-    """Get a creator's public profile by username."""
-    # First get the user
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    # Then get the profile with platform_links eagerly loaded
-    profile = db.query(CreatorProfile).options(
-        joinedload(CreatorProfile.platform_links)
-    ).filter(CreatorProfile.user_id == user.id).first()
-    
-    if not profile:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Creator profile not found"
-        )
-    
-    # Convert to dict and add username
-    profile_dict = {
-        "id": profile.id,
-        "user_id": profile.user_id,
-        "display_name": profile.display_name,
-        "bio": profile.bio,
-        "profile_image_url": profile.profile_image_url,
-        "header_image_url": profile.header_image_url,
-        "created_at": profile.created_at,
-        "updated_at": profile.updated_at,
-        "username": user.username,
-        "platform_links": [
-            {
-                "id": link.id,
-                "creator_profile_id": link.creator_profile_id,
-                "platform_name": link.platform_name,
-                "platform_url": link.platform_url,
-                "display_order": link.display_order,
-                "created_at": link.created_at,
-                "updated_at": link.updated_at
-            }
-            for link in profile.platform_links
-        ]
-    }
-    
-    return profile_dict
+    """Get a creator's public profile by username (supports conditional GET)."""
+    return conditional_get(
+        request, response, service.profile_cache_key(username),
+        probe=lambda: service.get_public_profile_version(db, username),
+        build=lambda: service.build_public_profile(db, username)
+    )
 
 
 @router.put("/profile", response_model=schemas.CreatorProfile)
 def update_profile(
     profile_update: schemas.CreatorProfileUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Update the current user's creator profile."""
     profile = service.get_creator_profile_by_user_id(db, current_user.id)
@@ -117,7 +79,7 @@ def update_profile(
 def add_platform_link(
     link_data: schemas.PlatformLinkCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Add a platform link to the creator profile."""
     profile = service.get_creator_profile_by_user_id(db, current_user.id)
@@ -135,7 +97,7 @@ def update_platform_link(
     link_id: str,
     link_update: schemas.PlatformLinkUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Update a platform link."""
     # Verify ownership
@@ -171,7 +133,7 @@ def update_platform_link(
 def delete_platform_link(
     link_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Delete a platform link."""
     # Verify ownership
@@ -207,7 +169,7 @@ def delete_platform_link(
 def reorder_platform_links(
     link_ids: List[str],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Reorder platform links."""
     profile = service.get_creator_profile_by_user_id(db, current_user.id)
@@ -1,6 +1,8 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import DateTime, func
 from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
 
 from app.domains.creator.models import CreatorProfile, PlatformLink
 from app.domains.creator.schemas import (
@@ -8,6 +10,7 @@ from app.domains.creator.schemas import (
     PlatformLinkCreate, PlatformLinkUpdate
 )
 from app.domains.auth.models import User
+from app.core.http_cache import Validators, invalidate, make_validators, latest
 
 
 # Creator Profile Services
@@ -33,6 +36,97 @@ def get_creator_profile_by_username(db: Session, username: str) -> Optional[Crea
     return get_creator_profile_by_user_id(db, user.id)
 
 
+def profile_cache_key(username: str) -> str:
+    return f"profile:{username}"
+
+
+def invalidate_public_profile(db: Session, profile_id: str):
+    """Drop cached public pages that show this profile, after a commit."""
+    # Imported here; the support domain already depends on this one
+    from app.domains.support.service import stats_cache_key
+    
+    username = db.query(User.username).join(
+        CreatorProfile, CreatorProfile.user_id == User.id
+    ).filter(CreatorProfile.id == profile_id).scalar()
+    if username:
+        invalidate(profile_cache_key(username), stats_cache_key(username))
+
+
+def get_public_profile_version(db: Session, username: str) -> Optional[Validators]:
+    """Get validators for a public profile from its timestamps, in one query."""
+    link_changed_at = func.max(
+        func.coalesce(PlatformLink.updated_at, PlatformLink.created_at),
+        type_=DateTime(timezone=True)
+    )
+    row = db.query(
+        CreatorProfile.id,
+        CreatorProfile.created_at,
+        CreatorProfile.updated_at,
+        link_changed_at,
+        func.count(PlatformLink.id)
+    ).join(
+        User, User.id == CreatorProfile.user_id
+    ).outerjoin(
+        PlatformLink, PlatformLink.creator_profile_id == CreatorProfile.id
+    ).filter(
+        User.username == username
+    ).group_by(
+        CreatorProfile.id, CreatorProfile.created_at, CreatorProfile.updated_at
+    ).first()
+    if not row:
+        return None
+    
+    profile_id, created_at, updated_at, links_changed_at, link_count = row
+    # The link count catches deletions, which leave no timestamp behind
+    return make_validators(
+        "profile", username, profile_id, created_at, updated_at, links_changed_at, link_count,
+        last_modified=latest(created_at, updated_at, links_changed_at)
+    )
+
+
+def build_public_profile(db: Session, username: str) -> dict:
+    """Build a creator's public profile with platform links as JSON-ready data."""
+    # First get the user
+    user = db.query(User).filter(User.username == username).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    # Then get the profile with platform_links eagerly loaded
+    profile = get_creator_profile_by_user_id(db, user.id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Creator profile not found"
+        )
+    
+    return jsonable_encoder({
+        "id": profile.id,
+        "user_id": profile.user_id,
+        "display_name": profile.display_name,
+        "bio": profile.bio,
+        "profile_image_url": profile.profile_image_url,
+        "header_image_url": profile.header_image_url,
+        "created_at": profile.created_at,
+        "updated_at": profile.updated_at,
+        "username": user.username,
+        "platform_links": [
+            {
+                "id": link.id,
+                "creator_profile_id": link.creator_profile_id,
+                "platform_name": link.platform_name,
+                "platform_url": link.platform_url,
+                "display_order": link.display_order,
+                "created_at": link.created_at,
+                "updated_at": link.updated_at
+            }
+            for link in profile.platform_links
+        ]
+    })
+
+
 def create_creator_profile(
     db: Session,
     user_id: str,
@@ -61,6 +155,8 @@ def create_creator_profile(
     )
     db.add(db_profile)
     db.commit()
+    # Pages cached before the profile existed show no display name or a 404
+    invalidate_public_profile(db, db_profile.id)
     db.refresh(db_profile)
     return db_profile
 
@@ -80,6 +176,7 @@ def update_creator_profile(
         setattr(db_profile, field, value)
     
     db.commit()
+    invalidate_public_profile(db, profile_id)
     db.refresh(db_profile)
     return db_profile
 
@@ -105,6 +202,7 @@ def create_platform_link(
     )
     db.add(db_link)
     db.commit()
+    invalidate_public_profile(db, creator_profile_id)
     db.refresh(db_link)
     return db_link
 
@@ -124,6 +222,7 @@ def update_platform_link(
         setattr(db_link, field, value)
     
     db.commit()
+    invalidate_public_profile(db, db_link.creator_profile_id)
     db.refresh(db_link)
     return db_link
 
@@ -134,8 +233,10 @@ def delete_platform_link(db: Session, link_id: str) -> bool:
     if not db_link:
         return False
     
+    creator_profile_id = db_link.creator_profile_id
     db.delete(db_link)
     db.commit()
+    invalidate_public_profile(db, creator_profile_id)
     return True
 
 
@@ -158,6 +259,7 @@ def reorder_platform_links(
             link_map[link_id].display_order = index
     
     db.commit()
+    invalidate_public_profile(db, creator_profile_id)
     
     # Return links in new order
     return [link_map[link_id] for link_id in link_ids if link_id in link_map]
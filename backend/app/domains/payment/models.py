@@ -15,6 +15,8 @@ class StripeAccount(Base):
     charges_enabled = Column(Boolean, default=False)
     payouts_enabled = Column(Boolean, default=False)
     details_submitted = Column(Boolean, default=False)
+    # When the flags above were last read from Stripe (naive UTC); NULL = never
+    status_synced_at = Column(DateTime, nullable=True)
     
     # Additional info
     country = Column(String(2), default="JP")
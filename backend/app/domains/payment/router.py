@@ -2,30 +2,43 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 import stripe
 
-from app.core.db import get_db
+from app.core.db import DbRunner, get_db, get_db_runner
 from app.core.config import settings
-from app.api.deps import get_current_active_user, get_current_creator
-from app.domains.auth.models import User
+from app.core.stripe_gateway import StripeUnavailable, stripe_gateway
+from app.api.deps import Principal, get_current_active_user, get_current_creator
 from app.domains.payment import schemas, service
+from app.domains.payment.status_refresh import account_status_refresher
+from app.domains.webhook import service as webhook_service
+from app.domains.webhook.worker import webhook_worker
 
 router = APIRouter(prefix="/payment", tags=["Payment"])
 
 
+def _stripe_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Payments are temporarily unavailable, please retry shortly",
+        headers={"Retry-After": str(int(settings.STRIPE_BREAKER_RESET_SECONDS))}
+    )
+
+
 @router.post("/connect/onboarding", response_model=schemas.StripeConnectLink)
 def create_onboarding_link(
     data: schemas.StripeConnectLinkRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_creator)
+    current_user: Principal = Depends(get_current_creator)
 ):
     """Create a Stripe Connect onboarding link for the current creator."""
     try:
         result = service.create_account_link(
             db=db,
-            user=current_user,
+            user_id=current_user.id,
             return_url=data.return_url,
             refresh_url=data.refresh_url
         )
         return result
+    except StripeUnavailable:
+        raise _stripe_unavailable()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -36,7 +49,7 @@ def create_onboarding_link(
 @router.get("/connect/status", response_model=schemas.StripeAccountStatus)
 def get_connect_status(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_creator)
+    current_user: Principal = Depends(get_current_creator)
 ):
     """Get Stripe Connect account status for the current creator."""
     account = service.get_account_status(db, current_user.id)
@@ -47,6 +60,8 @@ def get_connect_status(
             detail="Stripe account not found"
         )
     
+    # Served as stored; stale flags are refreshed for the next poll
+    account_status_refresher.refresh_if_stale(account)
     return account
 
 
@@ -54,18 +69,20 @@ def get_connect_status(
 def refresh_onboarding_link(
     data: schemas.StripeConnectLinkRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_creator)
+    current_user: Principal = Depends(get_current_creator)
 ):
     """Refresh the Stripe Connect onboarding link."""
     # This is the same as creating a new link
     try:
         result = service.create_account_link(
             db=db,
-            user=current_user,
+            user_id=current_user.id,
             return_url=data.return_url,
             refresh_url=data.refresh_url
         )
         return result
+    except StripeUnavailable:
+        raise _stripe_unavailable()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -77,7 +94,7 @@ def refresh_onboarding_link(
 def update_payout_settings(
     settings_data: schemas.PayoutSettings,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_creator)
+    current_user: Principal = Depends(get_current_creator)
 ):
     """Update payout settings for the creator's Stripe account."""
     success = service.update_payout_settings(
@@ -99,7 +116,7 @@ def update_payout_settings(
 @router.post("/webhooks/stripe")
 async def stripe_webhook_handler(
     request: Request,
-    db: Session = Depends(get_db)
+    run_db: DbRunner = Depends(get_db_runner)
 ):
     """Handle Stripe webhooks for Connect accounts."""
     payload = await request.body()
@@ -109,7 +126,7 @@ async def stripe_webhook_handler(
         raise HTTPException(status_code=400, detail="No signature header")
     
     try:
-        event = stripe.Webhook.construct_event(
+        event = stripe_gateway.construct_event(
             payload, sig_header, settings.STRIPE_CONNECT_WEBHOOK_SECRET
         )
     except ValueError:
@@ -117,9 +134,9 @@ async def stripe_webhook_handler(
     except stripe.error.SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Invalid signature")
     
-    # Handle account.updated event
-    if event['type'] == 'account.updated':
-        account = event['data']['object']
-        service.handle_account_updated(db, account['id'])
+    # Acknowledge at once; the inbox worker applies the event
+    if webhook_service.handles(webhook_service.CONNECT, event['type']):
+        await run_db(webhook_service.record_event, webhook_service.CONNECT, event, payload.decode())
+        webhook_worker.notify()
     
     return {"status": "success"}
@@ -21,6 +21,7 @@ class StripeAccountStatus(BaseModel):
     charges_enabled: bool
     payouts_enabled: bool
     details_submitted: bool
+    status_synced_at: Optional[datetime] = None  # freshness of the three flags
     created_at: datetime
     
     class Config:
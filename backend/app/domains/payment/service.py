@@ -4,13 +4,10 @@ from sqlalchemy.orm import Session
 import stripe
 
 from app.core.config import settings
+from app.core.stripe_gateway import stripe_gateway
 from app.domains.payment.models import StripeAccount
 from app.domains.auth.models import User
 
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
-
 def create_connect_account(db: Session, user: User) -> StripeAccount:
     """Create a Stripe Connect account for a user."""
     # Check if account already exists
@@ -19,7 +16,9 @@ def create_connect_account(db: Session, user: User) -> StripeAccount:
         return existing
     
     # Create Stripe Express account
-    account = stripe.Account.create(
+    # Keyed by user, so a retried or repeated request cannot open a second account
+    account = stripe_gateway.create_account(
+        idempotency_key=f"connect-account-{user.id}",
         type="express",
         country="JP",
         email=user.email,
@@ -51,21 +50,25 @@ def create_connect_account(db: Session, user: User) -> StripeAccount:
 
 def create_account_link(
     db: Session,
-    user: User,
+    user_id: str,
     return_url: str,
     refresh_url: str
 ) -> dict:
     """Create an account link for Stripe Connect onboarding."""
     # Get or create stripe account
     stripe_account = db.query(StripeAccount).filter(
-        StripeAccount.user_id == user.id
+        StripeAccount.user_id == user_id
     ).first()
     
     if not stripe_account:
+        # The account needs the email, which tokens do not carry
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise ValueError("User not found")
         stripe_account = create_connect_account(db, user)
     
     # Create account link
-    account_link = stripe.AccountLink.create(
+    account_link = stripe_gateway.create_account_link(
         account=stripe_account.stripe_account_id,
         refresh_url=refresh_url,
         return_url=return_url,
@@ -79,31 +82,68 @@ def create_account_link(
 
 
 def get_account_status(db: Session, user_id: str) -> Optional[StripeAccount]:
-    """Get Stripe account status for a user."""
-    stripe_account = db.query(StripeAccount).filter(
+    """Get the locally stored Stripe account status for a user.
+
+    No Stripe call: check is_account_status_stale and refresh in the
+    background (status_refresh.account_status_refresher) instead.
+    """
+    return db.query(StripeAccount).filter(
         StripeAccount.user_id == user_id
     ).first()
+
+
+def is_account_status_stale(stripe_account: StripeAccount) -> bool:
+    """True if the stored flags are older than STRIPE_ACCOUNT_STATUS_MAX_AGE_SECONDS."""
+    synced_at = stripe_account.status_synced_at
+    if synced_at is None:
+        return True
+    max_age = timedelta(seconds=settings.STRIPE_ACCOUNT_STATUS_MAX_AGE_SECONDS)
+    return datetime.utcnow() - synced_at > max_age
+
+
+def apply_account_status(stripe_account: StripeAccount, account) -> None:
+    """Copy the Connect flags of a Stripe Account object onto the local row."""
+    stripe_account.charges_enabled = account['charges_enabled']
+    stripe_account.payouts_enabled = account['payouts_enabled']
+    stripe_account.details_submitted = account['details_submitted']
+    stripe_account.status_synced_at = datetime.utcnow()
+
+
+def refresh_account_status(db: Session, account_id: str) -> Optional[StripeAccount]:
+    """Fetch an account's Connect flags from Stripe and store them.
+
+    Stripe is called before the session is used, so no connection is held
+    while it answers; the flags are then written in one short transaction.
+    """
+    account = stripe_gateway.retrieve_account(account_id)
+    
+    stripe_account = db.query(StripeAccount).filter(
+        StripeAccount.stripe_account_id == account_id
+    ).first()
     
     if not stripe_account:
         return None
     
-    # Fetch latest status from Stripe
-    try:
-        account = stripe.Account.retrieve(stripe_account.stripe_account_id)
-        
-        # Update local status
-        stripe_account.charges_enabled = account.charges_enabled
-        stripe_account.payouts_enabled = account.payouts_enabled
-        stripe_account.details_submitted = account.details_submitted
-        
-        db.commit()
-        db.refresh(stripe_account)
-    except stripe.error.StripeError:
-        pass
+    apply_account_status(stripe_account, account)
+    
+    db.commit()
+    db.refresh(stripe_account)
     
     return stripe_account
 
 
+def build_payout_settings(schedule_interval: str, delay_days: int) -> dict:
+    """Build the Stripe account settings payload for a payout schedule."""
+    return {
+        "payouts": {
+            "schedule": {
+                "interval": schedule_interval,
+                "delay_days": delay_days if schedule_interval != "manual" else None,
+            }
+        }
+    }
+
+
 def update_payout_settings(
     db: Session,
     user_id: str,
@@ -119,24 +159,34 @@ def update_payout_settings(
         return False
     
     try:
-        stripe.Account.modify(
+        stripe_gateway.modify_account(
             stripe_account.stripe_account_id,
-            settings={
-                "payouts": {
-                    "schedule": {
-                        "interval": schedule_interval,
-                        "delay_days": delay_days if schedule_interval != "manual" else None,
-                    }
-                }
-            }
+            settings=build_payout_settings(schedule_interval, delay_days)
         )
         return True
     except stripe.error.StripeError:
         return False
 
 
-def handle_account_updated(db: Session, account_id: str) -> Optional[StripeAccount]:
-    """Handle account.updated webhook from Stripe."""
+ACCOUNT_STATUS_FIELDS = ("charges_enabled", "payouts_enabled", "details_submitted")
+
+
+def is_complete_account(account: Optional[dict]) -> bool:
+    """True if an Account object from an event carries every Connect flag."""
+    return account is not None and all(isinstance(account.get(field), bool) for field in ACCOUNT_STATUS_FIELDS)
+
+
+def handle_account_updated(
+    db: Session,
+    account_id: str,
+    account: Optional[dict] = None
+) -> Optional[StripeAccount]:
+    """Handle account.updated webhook from Stripe.
+
+    `account` is the Account object from the event, when it is known to be
+    the newest one; its flags are applied without calling Stripe. Stripe
+    errors propagate so the webhook inbox retries the event.
+    """
     stripe_account = db.query(StripeAccount).filter(
         StripeAccount.stripe_account_id == account_id
     ).first()
@@ -144,17 +194,13 @@ def handle_account_updated(db: Session, account_id: str) -> Optional[StripeAccou
     if not stripe_account:
         return None
     
-    # Fetch latest status
-    try:
-        account = stripe.Account.retrieve(account_id)
-        
-        stripe_account.charges_enabled = account.charges_enabled
-        stripe_account.payouts_enabled = account.payouts_enabled
-        stripe_account.details_submitted = account.details_submitted
-        
-        db.commit()
-        db.refresh(stripe_account)
-    except stripe.error.StripeError:
-        pass
+    # Fetch latest status unless the event carries all of it
+    if not is_complete_account(account):
+        account = stripe_gateway.retrieve_account(account_id)
+    
+    apply_account_status(stripe_account, account)
+    
+    db.commit()
+    db.refresh(stripe_account)
     
     return stripe_account
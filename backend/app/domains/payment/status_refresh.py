@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.stripe_gateway import stripe_gateway
+from app.domains.payment import service
+from app.domains.payment.models import StripeAccount
+
+logger = logging.getLogger(__name__)
+
+
+class AccountStatusRefresher:
+    """Refreshes stale Connect account flags in the background.
+
+    Status polls are answered from the stored row; when it is older than
+    STRIPE_ACCOUNT_STATUS_MAX_AGE_SECONDS one refresh per account is started
+    on the Stripe gateway's threads. Polls arriving while it runs do not
+    start another (single-flight per worker process). At most
+    STRIPE_ACCOUNT_STATUS_REFRESH_CONCURRENCY refreshes run at once; polls
+    beyond that are served the stored flags and retry on a later poll.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self.started = 0
+        self.joined = 0
+        self.deferred = 0
+        self.failed = 0
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self.started = 0
+        self.joined = 0
+        self.deferred = 0
+        self.failed = 0
+
+    def refresh_if_stale(self, stripe_account: StripeAccount) -> bool:
+        """Start a background refresh if the row is stale; True if one is running."""
+        if not service.is_account_status_stale(stripe_account):
+            return False
+        account_id = stripe_account.stripe_account_id
+        with self._lock:
+            if account_id in self._in_flight:
+                self.joined += 1
+                return True
+            if len(self._in_flight) >= settings.STRIPE_ACCOUNT_STATUS_REFRESH_CONCURRENCY:
+                # Keep refreshes well below the database pool
+                self.deferred += 1
+                return False
+            self._in_flight.add(account_id)
+            self.started += 1
+        try:
+            stripe_gateway.submit(self._refresh, account_id)
+        except RuntimeError:
+            # The executor is shutting down with the process
+            with self._lock:
+                self._in_flight.discard(account_id)
+            return False
+        return True
+
+    def _refresh(self, account_id: str):
+        db = SessionLocal()
+        try:
+            service.refresh_account_status(db, account_id)
+        except Exception as e:
+            logger.warning("Refreshing Stripe account %s failed: %s", account_id, e)
+            with self._lock:
+                self.failed += 1
+        finally:
+            db.close()
+            with self._lock:
+                self._in_flight.discard(account_id)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "started": self.started,
+                "joined": self.joined,
+                "deferred": self.deferred,
+                "failed": self.failed,
+            }
+
+
+account_status_refresher = AccountStatusRefresher()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=account_status_refresher.reset_after_fork)
@@ -0,0 +1,245 @@
+from typing import List, Optional, Tuple
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from app.domains.auth.models import User
+from app.domains.support.models import (
+    Support, PaymentStatus, CreatorSupportTotals, CreatorDailyEarnings,
+    SupporterCreatorTotals
+)
+
+
+def _upsert_increment(db: Session, model, keys: dict, increments: dict):
+    """Insert a row or add increments to the existing one, atomically."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not implemented for {dialect}")
+    
+    table = model.__table__
+    stmt = insert(table).values(**keys, **increments, updated_at=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in increments},
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+
+def _lock_users(db: Session, user_ids: List[str], exclusive: bool):
+    """Row-lock users on PostgreSQL, in id order so lockers cannot deadlock.
+
+    A rebuild holds FOR UPDATE on its chunk while incremental updates take
+    FOR KEY SHARE on the users they touch, so the two serialize per user.
+    Ordinary user updates (FOR NO KEY UPDATE) are not blocked. SQLite has a
+    single writer and needs no locks.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    query = db.query(User.id).filter(User.id.in_(user_ids)).order_by(User.id)
+    if exclusive:
+        query = query.with_for_update()
+    else:
+        query = query.with_for_update(read=True, key_share=True)
+    query.all()
+
+
+def record_completed_support(db: Session, support: Support, completed_at: datetime):
+    """Add a newly completed support to the creator and supporter aggregates.
+
+    Call exactly once per support, inside the transaction that marks it
+    COMPLETED, so the aggregates commit or roll back with it.
+    """
+    _lock_users(db, sorted({support.creator_id, support.supporter_id}), exclusive=False)
+    increments = {"support_count": 1, "total_amount": support.amount}
+    _upsert_increment(
+        db, CreatorSupportTotals,
+        keys={"creator_id": support.creator_id},
+        increments=increments
+    )
+    _upsert_increment(
+        db, CreatorDailyEarnings,
+        keys={"creator_id": support.creator_id, "day": completed_at.date()},
+        increments=increments
+    )
+    _upsert_increment(
+        db, SupporterCreatorTotals,
+        keys={"supporter_id": support.supporter_id, "creator_id": support.creator_id},
+        increments=increments
+    )
+
+
+def _as_date(value) -> date:
+    # SQLite returns date() results as ISO strings
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _aggregate_daily(db: Session, creator_ids: List[str]) -> dict:
+    """Compute {(creator_id, day): (count, amount)} from supports."""
+    # Bucket by UTC day, as record_completed_support does
+    completed_at = Support.completed_at
+    if db.get_bind().dialect.name == "postgresql":
+        completed_at = func.timezone("UTC", completed_at)
+    day = func.date(completed_at)
+    rows = db.query(
+        Support.creator_id,
+        day,
+        func.count(Support.id),
+        func.coalesce(func.sum(Support.amount), 0)
+    ).filter(
+        Support.creator_id.in_(creator_ids),
+        Support.payment_status == PaymentStatus.COMPLETED
+    ).group_by(Support.creator_id, day).all()
+    return {
+        (creator_id, _as_date(day_value)): (count, amount)
+        for creator_id, day_value, count, amount in rows
+    }
+
+
+def _aggregate_totals(db: Session, creator_ids: List[str]) -> dict:
+    """Compute {creator_id: (count, amount)} from supports."""
+    rows = db.query(
+        Support.creator_id,
+        func.count(Support.id),
+        func.coalesce(func.sum(Support.amount), 0)
+    ).filter(
+        Support.creator_id.in_(creator_ids),
+        Support.payment_status == PaymentStatus.COMPLETED
+    ).group_by(Support.creator_id).all()
+    return {creator_id: (count, amount) for creator_id, count, amount in rows}
+
+
+def _aggregate_supporter(db: Session, supporter_ids: List[str]) -> dict:
+    """Compute {(supporter_id, creator_id): (count, amount)} from supports."""
+    rows = db.query(
+        Support.supporter_id,
+        Support.creator_id,
+        func.count(Support.id),
+        func.coalesce(func.sum(Support.amount), 0)
+    ).filter(
+        Support.supporter_id.in_(supporter_ids),
+        Support.payment_status == PaymentStatus.COMPLETED
+    ).group_by(Support.supporter_id, Support.creator_id).all()
+    return {
+        (supporter_id, creator_id): (count, amount)
+        for supporter_id, creator_id, count, amount in rows
+    }
+
+
+def _next_user_ids(db: Session, after: Optional[str], chunk_size: int) -> List[str]:
+    query = db.query(User.id)
+    if after is not None:
+        query = query.filter(User.id > after)
+    return [row.id for row in query.order_by(User.id).limit(chunk_size)]
+
+
+def rebuild_creator_aggregates(db: Session, after: Optional[str], chunk_size: int) -> Optional[str]:
+    """Recompute creator and supporter aggregates for the next chunk of users.
+
+    Returns the last user id processed, or None when there are no more.
+    Each chunk is its own transaction. Supports completed while it runs are
+    not lost: the chunk's users are locked against record_completed_support
+    on PostgreSQL, and on SQLite the first DELETE takes the write lock before
+    anything is read.
+    """
+    user_ids = _next_user_ids(db, after, chunk_size)
+    if not user_ids:
+        return None
+    
+    _lock_users(db, user_ids, exclusive=True)
+    db.query(CreatorSupportTotals).filter(
+        CreatorSupportTotals.creator_id.in_(user_ids)
+    ).delete(synchronize_session=False)
+    totals = _aggregate_totals(db, user_ids)
+    db.add_all([
+        CreatorSupportTotals(creator_id=creator_id, support_count=count, total_amount=amount)
+        for creator_id, (count, amount) in totals.items()
+    ])
+    
+    db.query(CreatorDailyEarnings).filter(
+        CreatorDailyEarnings.creator_id.in_(user_ids)
+    ).delete(synchronize_session=False)
+    daily = _aggregate_daily(db, user_ids)
+    db.add_all([
+        CreatorDailyEarnings(creator_id=creator_id, day=day, support_count=count, total_amount=amount)
+        for (creator_id, day), (count, amount) in daily.items()
+    ])
+    
+    db.query(SupporterCreatorTotals).filter(
+        SupporterCreatorTotals.supporter_id.in_(user_ids)
+    ).delete(synchronize_session=False)
+    given = _aggregate_supporter(db, user_ids)
+    db.add_all([
+        SupporterCreatorTotals(
+            supporter_id=supporter_id, creator_id=creator_id,
+            support_count=count, total_amount=amount
+        )
+        for (supporter_id, creator_id), (count, amount) in given.items()
+    ])
+    db.commit()
+    return user_ids[-1]
+
+
+def verify_creator_aggregates(
+    db: Session,
+    after: Optional[str],
+    chunk_size: int
+) -> Tuple[Optional[str], List[tuple]]:
+    """Compare stored aggregates with supports for the next chunk of users.
+
+    Returns (last user id processed or None, mismatches) where each
+    mismatch is (key, stored (count, amount), actual (count, amount)); the
+    key is a creator id for totals, (creator id, day) for daily rows and
+    (supporter id, creator id) for supporter rows.
+    """
+    user_ids = _next_user_ids(db, after, chunk_size)
+    if not user_ids:
+        return None, []
+    
+    actual = _aggregate_totals(db, user_ids)
+    stored = {
+        row.creator_id: (row.support_count, row.total_amount)
+        for row in db.query(CreatorSupportTotals).filter(
+            CreatorSupportTotals.creator_id.in_(user_ids)
+        )
+    }
+    
+    mismatches = []
+    for creator_id in user_ids:
+        expected = actual.get(creator_id, (0, 0))
+        found = stored.get(creator_id, (0, 0))
+        if expected != found:
+            mismatches.append((creator_id, found, expected))
+    
+    actual_daily = _aggregate_daily(db, user_ids)
+    stored_daily = {
+        (row.creator_id, row.day): (row.support_count, row.total_amount)
+        for row in db.query(CreatorDailyEarnings).filter(
+            CreatorDailyEarnings.creator_id.in_(user_ids)
+        )
+    }
+    for key in sorted(set(actual_daily) | set(stored_daily)):
+        expected = actual_daily.get(key, (0, 0))
+        found = stored_daily.get(key, (0, 0))
+        if expected != found:
+            mismatches.append((key, found, expected))
+    
+    actual_given = _aggregate_supporter(db, user_ids)
+    stored_given = {
+        (row.supporter_id, row.creator_id): (row.support_count, row.total_amount)
+        for row in db.query(SupporterCreatorTotals).filter(
+            SupporterCreatorTotals.supporter_id.in_(user_ids)
+        )
+    }
+    for key in sorted(set(actual_given) | set(stored_given)):
+        expected = actual_given.get(key, (0, 0))
+        found = stored_given.get(key, (0, 0))
+        if expected != found:
+            mismatches.append((key, found, expected))
+    return user_ids[-1], mismatches
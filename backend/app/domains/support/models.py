@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, String, Integer, BigInteger, Text, ForeignKey, Date, DateTime, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -34,3 +34,58 @@ class Support(Base):
     # Relationships
     supporter = relationship("User", foreign_keys=[supporter_id], backref="supports_given")
     creator = relationship("User", foreign_keys=[creator_id], backref="supports_received")
+    
+    __table_args__ = (
+        # Listings and stats filter on owner + status and page by (completed_at, id)
+        Index("ix_supports_creator_status_completed_id", "creator_id", "payment_status", "completed_at", "id"),
+        Index("ix_supports_supporter_status_completed_id", "supporter_id", "payment_status", "completed_at", "id"),
+        # PostgreSQL: smaller index over completed rows only, covering SUM(amount)
+        Index(
+            "ix_supports_creator_completed_id_partial", "creator_id", "completed_at", "id",
+            postgresql_where=text("payment_status = 'COMPLETED'"),
+            postgresql_include=["amount"],
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class CreatorSupportTotals(Base):
+    """Running totals of completed supports per creator.
+
+    Maintained by handle_checkout_completed in the same transaction that
+    completes a support; rebuilt with scripts/rebuild_support_aggregates.py.
+    """
+    __tablename__ = "creator_support_totals"
+    
+    creator_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    support_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(BigInteger, nullable=False, default=0)  # Amount in JPY
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class CreatorDailyEarnings(Base):
+    """Completed supports per creator per UTC day, for earnings charts.
+
+    Maintained alongside CreatorSupportTotals when a support completes.
+    """
+    __tablename__ = "creator_daily_earnings"
+    
+    creator_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    support_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(BigInteger, nullable=False, default=0)  # Amount in JPY
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class SupporterCreatorTotals(Base):
+    """Running totals of completed supports per (supporter, creator) pair.
+
+    Summed per supporter for /support/given, so the cost follows the number
+    of creators supported rather than the number of supports.
+    """
+    __tablename__ = "supporter_creator_totals"
+    
+    supporter_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    creator_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    support_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(BigInteger, nullable=False, default=0)  # Amount in JPY
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
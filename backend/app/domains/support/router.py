@@ -1,44 +1,38 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
 from sqlalchemy.orm import Session
 import stripe
 
-from app.core.db import get_db
+from app.core.db import DbRunner, get_db_runner, get_read_db
 from app.core.config import settings
-from app.api.deps import get_current_active_user
+from app.core.stripe_gateway import StripeUnavailable, stripe_gateway
+from app.core.http_cache import conditional_get
+from app.api.deps import Principal, get_current_active_user, get_current_creator
 from app.domains.auth.models import User
-from app.domains.creator.models import CreatorProfile  # Fix import
 from app.domains.support import schemas, service
+from app.domains.webhook import service as webhook_service
+from app.domains.webhook.worker import webhook_worker
 
 router = APIRouter(prefix="/support", tags=["Support"])
 
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+
+def _stripe_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Payments are temporarily unavailable, please retry shortly",
+        headers={"Retry-After": str(int(settings.STRIPE_BREAKER_RESET_SECONDS))}
+    )
 
 
 @router.post("/checkout", response_model=schemas.CheckoutSessionResponse)
-def create_checkout_session(
+async def create_checkout_session(
     creator_username: str,
     request_data: schemas.CreateCheckoutSessionRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    run_db: DbRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Create a Stripe checkout session for supporting a creator."""
-    # Get creator by username
-    creator = db.query(User).filter(User.username == creator_username).first()
-    if not creator:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Creator not found"
-        )
-    
-    # Cannot support yourself
-    if creator.id == current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You cannot support yourself"
-        )
-    
     # Validate amount
     if request_data.amount < settings.MINIMUM_SUPPORT_AMOUNT:
         raise HTTPException(
@@ -46,17 +40,17 @@ def create_checkout_session(
             detail=f"Minimum support amount is {settings.MINIMUM_SUPPORT_AMOUNT} JPY"
         )
     
+    # Async so the Stripe round trip holds no thread or database connection
     try:
-        result = service.create_checkout_session(
-            db=db,
+        result = await service.create_checkout_session(
+            run_db=run_db,
             supporter_id=current_user.id,
-            creator_id=creator.id,
+            creator_username=creator_username,
             amount=request_data.amount,
             message=request_data.message,
             success_url=request_data.success_url,
             cancel_url=request_data.cancel_url
         )
-        return result
     except ValueError as e:
         # Handle specific error for payment setup not completed
         if "payment setup" in str(e):
@@ -68,15 +62,24 @@ def create_checkout_session(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except StripeUnavailable:
+        raise _stripe_unavailable()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create checkout session"
         )
+    
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Creator not found"
+        )
+    return result
 
 
 @router.post("/webhook")
-async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
+async def stripe_webhook(request: Request, run_db: DbRunner = Depends(get_db_runner)):
     """Handle Stripe webhook events."""
     payload = await request.body()
     sig_header = request.headers.get('stripe-signature')
@@ -85,7 +88,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="No signature header")
     
     try:
-        event = stripe.Webhook.construct_event(
+        event = stripe_gateway.construct_event(
             payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
         )
     except ValueError:
@@ -93,97 +96,106 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
     except stripe.error.SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Invalid signature")
     
-    # Handle the checkout.session.completed event
-    if event['type'] == 'checkout.session.completed':
-        session = event['data']['object']
-        service.handle_checkout_completed(db, session)
+    # Acknowledge at once; the inbox worker applies the event
+    if webhook_service.handles(webhook_service.PLATFORM, event['type']):
+        await run_db(webhook_service.record_event, webhook_service.PLATFORM, event, payload.decode())
+        webhook_worker.notify()
     
     return {"status": "success"}
 
 
 @router.get("/received", response_model=schemas.CreatorSupportSummary)
 def get_received_supports(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    limit: int = Query(5, ge=1, le=50),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get supports received by the current user (creator)."""
-    stats = service.get_creator_stats(db, current_user.id)
+    total_supporters, total_amount = service.get_creator_totals(db, current_user.id)
+    try:
+        supports, next_cursor = service.get_creator_supports(
+            db, current_user.id, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return {
-        'total_received': stats['total_amount'],
-        'supporter_count': stats['total_supporters'],
-        'recent_supports': stats['recent_supports']
+        'total_received': total_amount,
+        'supporter_count': total_supporters,
+        'recent_supports': [
+            service.support_to_dict(
+                support,
+                supporter_username=support.supporter.username,
+                creator_username=current_user.username
+            )
+            for support in supports
+        ],
+        'next_cursor': next_cursor
     }
 
 
 @router.get("/given", response_model=schemas.SupporterSummary)
 def get_given_supports(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get supports given by the current user."""
-    supports = service.get_supporter_supports(db, current_user.id)
-    
-    # Calculate totals
-    total_given = sum(s.amount for s in supports)
-    creator_ids = list(set(s.creator_id for s in supports))
-    
-    # Convert to response format
-    recent_supports = []
-    for support in supports[:10]:  # Last 10 supports
-        creator = db.query(User).filter(User.id == support.creator_id).first()
-        creator_profile = db.query(CreatorProfile).filter(
-            CreatorProfile.user_id == support.creator_id
-        ).first()
-        
-        if creator and creator_profile:
-            recent_supports.append({
-                'id': support.id,
-                'supporter_id': support.supporter_id,
-                'creator_id': support.creator_id,
-                'amount': support.amount,
-                'message': support.message,
-                'payment_status': support.payment_status,
-                'created_at': support.created_at,
-                'completed_at': support.completed_at,
-                'supporter_username': current_user.username,
-                'creator_username': creator.username,
-                'creator_display_name': creator_profile.display_name
-            })
+    try:
+        return service.get_supporter_summary(
+            db, current_user, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/earnings", response_model=schemas.EarningsSeries)
+def get_earnings(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: schemas.EarningsInterval = schemas.EarningsInterval.DAY,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_creator)
+):
+    """Get the current creator's earnings series (defaults to the last 30 days)."""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
     
-    return {
-        'total_given': total_given,
-        'creator_count': len(creator_ids),
-        'recent_supports': recent_supports
-    }
+    try:
+        return service.get_earnings_series(db, current_user.id, start, end, interval)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.get("/creator/{username}/stats", response_model=schemas.SupportStats)
 def get_creator_support_stats(
     username: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
-    """Get public support statistics for a creator."""
-    # Get creator by username
-    creator = db.query(User).filter(User.username == username).first()
-    if not creator:
+    """Get public support statistics for a creator (supports conditional GET)."""
+    stats = conditional_get(
+        request, response, service.stats_cache_key(username),
+        probe=lambda: service.get_public_stats_version(db, username),
+        build=lambda: service.build_public_creator_stats(db, username)
+    )
+    if stats is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Creator not found"
         )
-    
-    stats = service.get_creator_stats(db, creator.id)
-    
-    # Add creator info to recent supports
-    creator_profile = db.query(CreatorProfile).filter(
-        CreatorProfile.user_id == creator.id
-    ).first()
-    
-    if creator_profile:
-        for support in stats['recent_supports']:
-            support['creator_username'] = creator.username
-            support['creator_display_name'] = creator_profile.display_name
-    
     return stats
 
 
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -11,6 +11,12 @@ class PaymentStatusEnum(str, Enum):
     REFUNDED = "refunded"
 
 
+class EarningsInterval(str, Enum):
+    DAY = "day"
+    WEEK = "week"  # ISO weeks, starting Monday
+    MONTH = "month"
+
+
 # Request schemas
 class CreateSupportRequest(BaseModel):
     creator_id: str
@@ -62,9 +68,26 @@ class CreatorSupportSummary(BaseModel):
     total_received: int
     supporter_count: int
     recent_supports: List[SupportWithUsers]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
 
 
 class SupporterSummary(BaseModel):
     total_given: int
     creator_count: int
     recent_supports: List[SupportWithUsers]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+class EarningsPoint(BaseModel):
+    period_start: date
+    support_count: int
+    total_amount: int
+
+
+class EarningsSeries(BaseModel):
+    interval: EarningsInterval
+    start: date
+    end: date
+    support_count: int
+    total_amount: int
+    points: List[EarningsPoint]
@@ -1,128 +1,196 @@
-from typing import List, Optional
-from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, func
-import stripe
+from sqlalchemy import desc, func, tuple_
+import base64
+import binascii
+import json
+import uuid
+from fastapi.encoders import jsonable_encoder
 
 from app.core.config import settings
-from app.domains.support.models import Support, PaymentStatus
-from app.domains.support.schemas import CreateSupportRequest, SupportWithUsers
+from app.core.http_cache import Validators, invalidate, make_validators, latest
+from app.core.stripe_gateway import stripe_gateway
+from app.domains.support import aggregates
+from app.domains.support.models import (
+    Support, PaymentStatus, CreatorSupportTotals, CreatorDailyEarnings,
+    SupporterCreatorTotals
+)
+from app.domains.support.schemas import CreateSupportRequest, SupportWithUsers, EarningsInterval
 from app.domains.auth.models import User
 from app.domains.creator.models import CreatorProfile
 from app.domains.payment.models import StripeAccount
 
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+@dataclass(frozen=True, slots=True)
+class CheckoutDraft:
+    """A committed PENDING support and the Stripe session to open for it."""
+    support_id: str
+    session_params: dict
 
 
-def create_checkout_session(
+def start_checkout(
     db: Session,
     supporter_id: str,
-    creator_id: str,
+    creator_username: str,
     amount: int,
     message: Optional[str],
     success_url: str,
     cancel_url: str
-) -> dict:
-    """Create a Stripe checkout session for supporting a creator."""
-    
-    # Get creator information
-    creator = db.query(User).filter(User.id == creator_id).first()
+) -> Optional[CheckoutDraft]:
+    """Record a PENDING support and build its checkout session parameters.
+
+    Returns None if the creator does not exist. Commits before returning,
+    so no transaction stays open while Stripe is called.
+    """
+    creator = db.query(
+        User.id, User.username, CreatorProfile.display_name,
+        StripeAccount.stripe_account_id, StripeAccount.charges_enabled, StripeAccount.payouts_enabled
+    ).outerjoin(
+        CreatorProfile, CreatorProfile.user_id == User.id
+    ).outerjoin(
+        StripeAccount, StripeAccount.user_id == User.id
+    ).filter(User.username == creator_username).first()
     if not creator:
-        raise ValueError("Creator not found")
-    
-    creator_profile = db.query(CreatorProfile).filter(
-        CreatorProfile.user_id == creator_id
-    ).first()
-    
-    if not creator_profile:
+        return None
+
+    if creator.id == supporter_id:
+        raise ValueError("You cannot support yourself")
+
+    if creator.display_name is None:
         raise ValueError("Creator profile not found")
-    
+
     # Check if creator has Stripe account
-    stripe_account = db.query(StripeAccount).filter(
-        StripeAccount.user_id == creator_id,
-        StripeAccount.charges_enabled == True,
-        StripeAccount.payouts_enabled == True
-    ).first()
-    
+    destination = None
+    if creator.charges_enabled and creator.payouts_enabled:
+        destination = creator.stripe_account_id
+
     # TEMPORARY: Comment out the check for development
-    # if not stripe_account:
+    # if not destination:
     #     raise ValueError("Creator has not completed payment setup. They need to connect their bank account first.")
-    
+
     # Create support record with pending status
-    support = Support(
+    support_id = str(uuid.uuid4())
+    db.add(Support(
+        id=support_id,
         supporter_id=supporter_id,
-        creator_id=creator_id,
+        creator_id=creator.id,
         amount=amount,
         message=message,
         payment_status=PaymentStatus.PENDING
-    )
-    db.add(support)
+    ))
     db.commit()
-    db.refresh(support)
-    
+
     # Calculate platform fee (10%)
     platform_fee = int(amount * settings.PLATFORM_FEE_PERCENT / 100)
-    
-    # Create Stripe checkout session
-    try:
-        session_params = {
-            'payment_method_types': ['card'],
-            'line_items': [{
-                'price_data': {
-                    'currency': 'jpy',
-                    'product_data': {
-                        'name': f'Support for {creator_profile.display_name}',
-                        'description': f'One-time support for @{creator.username}',
-                    },
-                    'unit_amount': amount,
+
+    session_params = {
+        'payment_method_types': ['card'],
+        'line_items': [{
+            'price_data': {
+                'currency': 'jpy',
+                'product_data': {
+                    'name': f'Support for {creator.display_name}',
+                    'description': f'One-time support for @{creator.username}',
                 },
-                'quantity': 1,
-            }],
-            'mode': 'payment',
-            'success_url': success_url,
-            'cancel_url': cancel_url,
-            'client_reference_id': support.id,
-            'metadata': {
-                'support_id': support.id,
-                'supporter_id': supporter_id,
-                'creator_id': creator_id
-            }
+                'unit_amount': amount,
+            },
+            'quantity': 1,
+        }],
+        'mode': 'payment',
+        'success_url': success_url,
+        'cancel_url': cancel_url,
+        'client_reference_id': support_id,
+        'metadata': {
+            'support_id': support_id,
+            'supporter_id': supporter_id,
+            'creator_id': creator.id
         }
-        
-        # If creator has connected account, set up automatic transfer
-        if stripe_account:
-            session_params['payment_intent_data'] = {
-                'application_fee_amount': platform_fee,
-                'transfer_data': {
-                    'destination': stripe_account.stripe_account_id,
-                }
+    }
+
+    # If creator has connected account, set up automatic transfer
+    if destination:
+        session_params['payment_intent_data'] = {
+            'application_fee_amount': platform_fee,
+            'transfer_data': {
+                'destination': destination,
             }
-        # TEMPORARY: If no connected account, payment goes to platform
-        else:
-            print(f"WARNING: Creator {creator.username} has no connected account. Payment will go to platform.")
-        
-        session = stripe.checkout.Session.create(**session_params)
-        
-        # Update support record with Stripe session ID
-        support.stripe_checkout_session_id = session.id
-        db.commit()
-        
-        return {
-            'checkout_url': session.url,
-            'session_id': session.id
         }
-        
-    except Exception as e:
+    # TEMPORARY: If no connected account, payment goes to platform
+    else:
+        print(f"WARNING: Creator {creator.username} has no connected account. Payment will go to platform.")
+
+    return CheckoutDraft(support_id=support_id, session_params=session_params)
+
+
+def attach_checkout_session(db: Session, support_id: str, session_id: str) -> None:
+    """Store the Stripe session ID on a pending support."""
+    db.query(Support).filter(Support.id == support_id).update(
+        {Support.stripe_checkout_session_id: session_id}, synchronize_session=False
+    )
+    db.commit()
+
+
+def fail_checkout(db: Session, support_id: str) -> None:
+    """Mark a support as failed when its checkout session could not be opened."""
+    db.query(Support).filter(
+        Support.id == support_id,
+        Support.payment_status == PaymentStatus.PENDING
+    ).update({Support.payment_status: PaymentStatus.FAILED}, synchronize_session=False)
+    db.commit()
+
+
+async def open_checkout_session(draft: CheckoutDraft, run_db: Callable[..., Awaitable]) -> dict:
+    """Open the Stripe session for a draft and record the outcome.
+
+    `run_db(fn, *args)` runs `fn(session, *args)` off the event loop; each
+    call is its own short transaction. Nothing is held while Stripe answers.
+    """
+    try:
+        # Keyed by support, so retries never open a second session for it
+        session = await stripe_gateway.run_async(
+            stripe_gateway.create_checkout_session,
+            idempotency_key=f"checkout-{draft.support_id}", **draft.session_params
+        )
+    except Exception:
         # If Stripe fails, mark support as failed
-        support.payment_status = PaymentStatus.FAILED
-        db.commit()
-        raise e
+        await run_db(fail_checkout, draft.support_id)
+        raise
+
+    await run_db(attach_checkout_session, draft.support_id, session.id)
+    return {
+        'checkout_url': session.url,
+        'session_id': session.id
+    }
+
+
+async def create_checkout_session(
+    run_db: Callable[..., Awaitable],
+    supporter_id: str,
+    creator_username: str,
+    amount: int,
+    message: Optional[str],
+    success_url: str,
+    cancel_url: str
+) -> Optional[dict]:
+    """Create a Stripe checkout session for supporting a creator.
+
+    Returns None if the creator does not exist. The connection goes back to
+    the pool between the two transactions around the Stripe call.
+    """
+    draft = await run_db(
+        start_checkout, supporter_id, creator_username, amount, message, success_url, cancel_url
+    )
+    if draft is None:
+        return None
+    return await open_checkout_session(draft, run_db)
 
 
 def check_creator_can_receive_payments(db: Session, creator_id: str) -> bool:
     """Check if a creator can receive payments."""
     # TEMPORARY: Always return True for development
+    # (public stats are cached by username; restoring the check below also
+    # needs the stats entry dropped when account.updated changes the flags)
     return True
     
     # Original implementation:
@@ -145,89 +213,338 @@ def handle_checkout_completed(db: Session, session: dict) -> Optional[Support]:
     if not support:
         return None
     
-    # Update support status
-    support.payment_status = PaymentStatus.COMPLETED
-    support.completed_at = datetime.utcnow()
-    support.stripe_payment_intent_id = session.get('payment_intent')
+    # Update support status; Stripe retries deliveries, so only the first
+    # one completes the support and counts towards the creator's totals
+    completed_at = datetime.utcnow()
+    completed = db.query(Support).filter(
+        Support.id == support_id,
+        Support.payment_status != PaymentStatus.COMPLETED
+    ).update({
+        Support.payment_status: PaymentStatus.COMPLETED,
+        Support.completed_at: completed_at,
+        Support.stripe_payment_intent_id: session.get('payment_intent')
+    }, synchronize_session=False)
+    
+    if completed:
+        aggregates.record_completed_support(db, support, completed_at)
     
     db.commit()
+    if completed:
+        invalidate(stats_cache_key(support.creator.username))
     db.refresh(support)
     
     return support
 
 
+def encode_cursor(support: Support) -> str:
+    """Encode the (completed_at, id) position of a support as an opaque token."""
+    position = json.dumps([support.completed_at.isoformat(), support.id])
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor token; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        completed_at, support_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(completed_at), str(support_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _paginate(query, limit: int, cursor: Optional[str]) -> Tuple[list, Optional[str]]:
+    """Return one keyset page of completed supports, newest first.
+
+    Each page seeks past the previous page's last (completed_at, id) on the
+    listing indexes, so deep pages cost the same as the first one. Rows may
+    be Support objects or tuples whose first element is the Support.
+    """
+    if cursor:
+        completed_at, support_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Support.completed_at, Support.id) < tuple_(completed_at, support_id)
+        )
+    
+    supports = query.order_by(
+        desc(Support.completed_at), desc(Support.id)
+    ).limit(limit + 1).all()
+    
+    if len(supports) > limit:
+        supports = supports[:limit]
+        last = supports[-1]
+        return supports, encode_cursor(last if isinstance(last, Support) else last[0])
+    return supports, None
+
+
 def get_creator_supports(
     db: Session,
     creator_id: str,
     limit: int = 10,
-    offset: int = 0
-) -> List[Support]:
-    """Get supports received by a creator."""
-    return db.query(Support).filter(
+    cursor: Optional[str] = None
+) -> Tuple[List[Support], Optional[str]]:
+    """Get a page of supports received by a creator and the next cursor."""
+    query = db.query(Support).options(
+        joinedload(Support.supporter)
+    ).filter(
         Support.creator_id == creator_id,
         Support.payment_status == PaymentStatus.COMPLETED
-    ).order_by(desc(Support.completed_at)).offset(offset).limit(limit).all()
+    )
+    return _paginate(query, limit, cursor)
 
 
 def get_supporter_supports(
     db: Session,
     supporter_id: str,
     limit: int = 10,
-    offset: int = 0
-) -> List[Support]:
-    """Get supports given by a supporter."""
-    return db.query(Support).filter(
+    cursor: Optional[str] = None
+) -> Tuple[List[Support], Optional[str]]:
+    """Get a page of supports given by a supporter and the next cursor."""
+    query = db.query(Support).filter(
         Support.supporter_id == supporter_id,
         Support.payment_status == PaymentStatus.COMPLETED
-    ).order_by(desc(Support.completed_at)).offset(offset).limit(limit).all()
+    )
+    return _paginate(query, limit, cursor)
 
 
-def get_creator_stats(db: Session, creator_id: str) -> dict:
-    """Get support statistics for a creator."""
-    result = db.query(
-        func.count(Support.id).label('total_supporters'),
-        func.sum(Support.amount).label('total_amount')
+def get_supporter_supports_with_creators(
+    db: Session,
+    supporter_id: str,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Tuple[Support, str, str]], Optional[str]]:
+    """Get a page of (support, creator username, creator display name) in one query."""
+    query = db.query(
+        Support, User.username, CreatorProfile.display_name
+    ).join(
+        User, User.id == Support.creator_id
+    ).join(
+        CreatorProfile, CreatorProfile.user_id == Support.creator_id
     ).filter(
-        Support.creator_id == creator_id,
+        Support.supporter_id == supporter_id,
         Support.payment_status == PaymentStatus.COMPLETED
+    )
+    return _paginate(query, limit, cursor)
+
+
+def get_supporter_totals(db: Session, supporter_id: str) -> Tuple[int, int]:
+    """Get (total amount given, number of creators supported) for a supporter."""
+    total_given, creator_count = db.query(
+        func.coalesce(func.sum(SupporterCreatorTotals.total_amount), 0),
+        func.count(SupporterCreatorTotals.creator_id)
+    ).filter(
+        SupporterCreatorTotals.supporter_id == supporter_id
+    ).one()
+    return total_given, creator_count
+
+
+def get_supporter_summary(
+    db: Session,
+    supporter: User,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> dict:
+    """Get a supporter's totals and a page of their supports."""
+    rows, next_cursor = get_supporter_supports_with_creators(
+        db, supporter.id, limit=limit, cursor=cursor
+    )
+    total_given, creator_count = get_supporter_totals(db, supporter.id)
+    
+    return {
+        'total_given': total_given,
+        'creator_count': creator_count,
+        'recent_supports': [
+            support_to_dict(
+                support,
+                supporter_username=supporter.username,
+                creator_username=creator_username,
+                creator_display_name=creator_display_name
+            )
+            for support, creator_username, creator_display_name in rows
+        ],
+        'next_cursor': next_cursor
+    }
+
+
+def support_to_dict(
+    support: Support,
+    supporter_username: str = '',
+    creator_username: str = '',
+    creator_display_name: str = ''
+) -> dict:
+    """Convert a support to the SupportWithUsers response format."""
+    return {
+        'id': support.id,
+        'supporter_id': support.supporter_id,
+        'creator_id': support.creator_id,
+        'amount': support.amount,
+        'message': support.message,
+        'payment_status': support.payment_status,
+        'created_at': support.created_at,
+        'completed_at': support.completed_at,
+        'supporter_username': supporter_username,
+        'creator_username': creator_username,
+        'creator_display_name': creator_display_name
+    }
+
+
+def get_creator_totals(db: Session, creator_id: str) -> Tuple[int, int]:
+    """Get (number of completed supports, total amount) for a creator."""
+    totals = db.query(CreatorSupportTotals).filter(
+        CreatorSupportTotals.creator_id == creator_id
     ).first()
+    if not totals:
+        return 0, 0
+    return totals.support_count, totals.total_amount
+
+
+def get_creator_stats(db: Session, creator_id: str) -> dict:
+    """Get support statistics for a creator."""
+    total_supporters, total_amount = get_creator_totals(db, creator_id)
     
-    recent_supports = db.query(Support).options(
-        joinedload(Support.supporter)
-    ).filter(
-        Support.creator_id == creator_id,
-        Support.payment_status == PaymentStatus.COMPLETED
-    ).order_by(desc(Support.completed_at)).limit(5).all()
+    recent_supports, _ = get_creator_supports(db, creator_id, limit=5)
     
     # Convert to SupportWithUsers format
-    recent_supports_with_users = []
-    for support in recent_supports:
-        support_dict = {
-            'id': support.id,
-            'supporter_id': support.supporter_id,
-            'creator_id': support.creator_id,
-            'amount': support.amount,
-            'message': support.message,
-            'payment_status': support.payment_status,
-            'created_at': support.created_at,
-            'completed_at': support.completed_at,
-            'supporter_username': support.supporter.username,
-            'creator_username': '',
-            'creator_display_name': ''
-        }
-        recent_supports_with_users.append(support_dict)
+    recent_supports_with_users = [
+        support_to_dict(support, supporter_username=support.supporter.username)
+        for support in recent_supports
+    ]
     
     # Check if creator can receive payments
     can_receive_payments = check_creator_can_receive_payments(db, creator_id)
     
     return {
-        'total_supporters': result.total_supporters or 0,
-        'total_amount': result.total_amount or 0,
+        'total_supporters': total_supporters,
+        'total_amount': total_amount,
         'recent_supports': recent_supports_with_users,
         'can_receive_payments': can_receive_payments
     }
 
 
+# Longest range an earnings series may cover
+MAX_EARNINGS_RANGE_DAYS = 1100
+
+
+def _period_start(day: date, interval: EarningsInterval) -> date:
+    if interval == EarningsInterval.WEEK:
+        return day - timedelta(days=day.weekday())
+    if interval == EarningsInterval.MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(period_start: date, interval: EarningsInterval) -> date:
+    if interval == EarningsInterval.WEEK:
+        return period_start + timedelta(days=7)
+    if interval == EarningsInterval.MONTH:
+        if period_start.month == 12:
+            return period_start.replace(year=period_start.year + 1, month=1)
+        return period_start.replace(month=period_start.month + 1)
+    return period_start + timedelta(days=1)
+
+
+def get_earnings_series(
+    db: Session,
+    creator_id: str,
+    start: date,
+    end: date,
+    interval: EarningsInterval = EarningsInterval.DAY
+) -> dict:
+    """Get a creator's earnings per day/week/month between start and end.
+
+    Served from the daily rollups; periods without supports are included
+    with zero totals so charts get a contiguous series.
+    """
+    if end < start:
+        raise ValueError("end must not be before start")
+    if (end - start).days > MAX_EARNINGS_RANGE_DAYS:
+        raise ValueError(f"Date range cannot exceed {MAX_EARNINGS_RANGE_DAYS} days")
+    
+    buckets = {}
+    period = _period_start(start, interval)
+    while period <= end:
+        buckets[period] = [0, 0]
+        period = _next_period(period, interval)
+    
+    rows = db.query(
+        CreatorDailyEarnings.day,
+        CreatorDailyEarnings.support_count,
+        CreatorDailyEarnings.total_amount
+    ).filter(
+        CreatorDailyEarnings.creator_id == creator_id,
+        CreatorDailyEarnings.day >= start,
+        CreatorDailyEarnings.day <= end
+    ).all()
+    
+    for day, support_count, total_amount in rows:
+        bucket = buckets[_period_start(day, interval)]
+        bucket[0] += support_count
+        bucket[1] += total_amount
+    
+    return {
+        'interval': interval,
+        'start': start,
+        'end': end,
+        'support_count': sum(count for count, _ in buckets.values()),
+        'total_amount': sum(amount for _, amount in buckets.values()),
+        'points': [
+            {'period_start': period, 'support_count': count, 'total_amount': amount}
+            for period, (count, amount) in buckets.items()
+        ]
+    }
+
+
 def get_support_by_id(db: Session, support_id: str) -> Optional[Support]:
     """Get a support by ID."""
     return db.query(Support).filter(Support.id == support_id).first()
+
+
+def stats_cache_key(username: str) -> str:
+    return f"stats:{username}"
+
+
+def get_public_stats_version(db: Session, username: str) -> Optional[Validators]:
+    """Get validators for a creator's public stats from the running totals."""
+    row = db.query(
+        User.id,
+        CreatorSupportTotals.support_count,
+        CreatorSupportTotals.updated_at,
+        CreatorProfile.created_at,
+        CreatorProfile.updated_at
+    ).outerjoin(
+        CreatorSupportTotals, CreatorSupportTotals.creator_id == User.id
+    ).outerjoin(
+        CreatorProfile, CreatorProfile.user_id == User.id
+    ).filter(
+        User.username == username
+    ).first()
+    if not row:
+        return None
+    
+    # support_count only grows, so it pins the totals and recent supports;
+    # the profile timestamps cover the embedded display name
+    creator_id, support_count, totals_updated_at, profile_created_at, profile_updated_at = row
+    return make_validators(
+        "stats", username, creator_id, support_count, profile_created_at, profile_updated_at,
+        last_modified=latest(totals_updated_at, profile_created_at, profile_updated_at)
+    )
+
+
+def build_public_creator_stats(db: Session, username: str) -> Optional[dict]:
+    """Build public support statistics for a creator as JSON-ready data."""
+    creator = db.query(User).filter(User.username == username).first()
+    if not creator:
+        return None
+    
+    stats = get_creator_stats(db, creator.id)
+    
+    # Add creator info to recent supports
+    creator_profile = db.query(CreatorProfile).filter(
+        CreatorProfile.user_id == creator.id
+    ).first()
+    
+    if creator_profile:
+        for support in stats['recent_supports']:
+            support['creator_username'] = creator.username
+            support['creator_display_name'] = creator_profile.display_name
+    
+    return jsonable_encoder(stats)
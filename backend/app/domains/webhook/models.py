@@ -0,0 +1,43 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Text, DateTime, Enum, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.core.db import Base
+
+
+class WebhookEventStatus(enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"  # gave up after WEBHOOK_MAX_ATTEMPTS
+
+
+class WebhookEvent(Base):
+    """A verified Stripe event waiting in (or drained from) the inbox."""
+    __tablename__ = "webhook_events"
+    
+    # Stripe's event id; redeliveries of the same event collapse onto one row
+    id = Column(String(255), primary_key=True)
+    source = Column(String(20), nullable=False)  # "platform" or "connect"
+    type = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False)  # the verified request body
+    event_created = Column(BigInteger, nullable=True)  # Stripe's `created`, unix seconds
+    # Events with the same key supersede each other (e.g. "account:acct_...")
+    coalesce_key = Column(String(255), nullable=True)
+    
+    status = Column(Enum(WebhookEventStatus), default=WebhookEventStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    # Naive UTC from datetime.utcnow(), like every comparison the worker makes
+    next_attempt_at = Column(DateTime, nullable=False)
+    locked_until = Column(DateTime, nullable=True)
+    claim_token = Column(String(36), nullable=True)
+    last_error = Column(Text, nullable=True)
+    
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # The worker claims due events in order
+        Index("ix_webhook_events_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_webhook_events_coalesce_key_status", "coalesce_key", "status"),
+    )
@@ -0,0 +1,272 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_
+import json
+import random
+import uuid
+
+from app.core.config import settings
+from app.domains.payment import service as payment_service
+from app.domains.support import service as support_service
+from app.domains.webhook.models import WebhookEvent, WebhookEventStatus
+
+# Which endpoint (and signing secret) an event arrived through
+PLATFORM = "platform"
+CONNECT = "connect"
+
+
+def _checkout_completed(db: Session, session: dict, latest: bool):
+    support_service.handle_checkout_completed(db, session)
+
+
+def _account_updated(db: Session, account: dict, latest: bool):
+    # An account snapshot that may be outdated is re-fetched instead
+    payment_service.handle_account_updated(db, account['id'], account if latest else None)
+
+
+# (source, event type) -> handler(db, event data object, latest); other
+# events are acknowledged without being stored. `latest` is False when a
+# newer event for the same coalesce key may already have been applied.
+HANDLERS: Dict[Tuple[str, str], Callable[[Session, dict, bool], None]] = {
+    (PLATFORM, "checkout.session.completed"): _checkout_completed,
+    (CONNECT, "account.updated"): _account_updated,
+}
+
+# (source, event type) -> key of the thing the event describes. Only the
+# newest event per key matters, so events with a key wait
+# WEBHOOK_COALESCE_SECONDS and are then applied together, once.
+COALESCE_KEYS: Dict[Tuple[str, str], Callable[[dict], str]] = {
+    (CONNECT, "account.updated"): lambda account: f"account:{account['id']}",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ClaimedEvent:
+    """An inbox event leased to one worker by claim_events."""
+    id: str
+    source: str
+    type: str
+    payload: str
+    attempts: int
+    event_created: Optional[int]
+    coalesce_key: Optional[str]
+    claim_token: str
+
+
+def handles(source: str, event_type: str) -> bool:
+    return (source, event_type) in HANDLERS
+
+
+def record_event(db: Session, source: str, event: dict, payload: str) -> bool:
+    """Store a verified event in the inbox; False if it is already there."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not implemented for {dialect}")
+    
+    coalesce = COALESCE_KEYS.get((source, event['type']))
+    coalesce_key = coalesce(event['data']['object']) if coalesce else None
+    next_attempt_at = datetime.utcnow()
+    if coalesce_key:
+        next_attempt_at += timedelta(seconds=settings.WEBHOOK_COALESCE_SECONDS)
+    
+    stmt = insert(WebhookEvent.__table__).values(
+        id=event['id'],
+        source=source,
+        type=event['type'],
+        payload=payload,
+        event_created=event.get('created'),
+        coalesce_key=coalesce_key,
+        status=WebhookEventStatus.PENDING,
+        attempts=0,
+        next_attempt_at=next_attempt_at
+    ).on_conflict_do_nothing(index_elements=["id"])
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount == 1
+
+
+def _due(now: datetime):
+    return or_(
+        and_(WebhookEvent.status == WebhookEventStatus.PENDING, WebhookEvent.next_attempt_at <= now),
+        # Left behind by a worker that died mid-batch
+        and_(WebhookEvent.status == WebhookEventStatus.PROCESSING, WebhookEvent.locked_until < now),
+    )
+
+
+def claim_events(db: Session, limit: int, lease_seconds: float) -> List[ClaimedEvent]:
+    """Lease up to `limit` due events to the caller, oldest first.
+
+    Pending events sharing a coalesce key with a claimed one are claimed
+    with it even if not due yet, since they are applied together.
+
+    Safe with several workers and processes: candidates and their siblings
+    are locked with SKIP LOCKED on PostgreSQL, so claimers never wait on each
+    other, and the claiming UPDATE only takes locked rows that are still
+    claimable, so each event goes to one claimer.
+    """
+    now = datetime.utcnow()
+    candidates = db.query(WebhookEvent.id, WebhookEvent.coalesce_key).filter(
+        _due(now)
+    ).order_by(WebhookEvent.next_attempt_at).limit(limit).with_for_update(skip_locked=True).all()
+    if not candidates:
+        db.rollback()
+        return []
+    
+    ids = [event_id for event_id, _ in candidates]
+    keys = {key for _, key in candidates if key is not None}
+    if keys:
+        # Siblings another claimer holds are left to it
+        ids += [
+            event_id for event_id, in db.query(WebhookEvent.id).filter(
+                WebhookEvent.coalesce_key.in_(keys),
+                WebhookEvent.status == WebhookEventStatus.PENDING,
+                WebhookEvent.id.notin_(ids)
+            ).with_for_update(skip_locked=True)
+        ]
+    
+    claim_token = str(uuid.uuid4())
+    db.query(WebhookEvent).filter(
+        WebhookEvent.id.in_(ids),
+        or_(_due(now), WebhookEvent.status == WebhookEventStatus.PENDING)
+    ).update({
+        WebhookEvent.status: WebhookEventStatus.PROCESSING,
+        WebhookEvent.attempts: WebhookEvent.attempts + 1,
+        WebhookEvent.locked_until: now + timedelta(seconds=lease_seconds),
+        WebhookEvent.claim_token: claim_token,
+    }, synchronize_session=False)
+    db.commit()
+    
+    rows = db.query(
+        WebhookEvent.id, WebhookEvent.source, WebhookEvent.type, WebhookEvent.payload,
+        WebhookEvent.attempts, WebhookEvent.event_created, WebhookEvent.coalesce_key
+    ).filter(WebhookEvent.claim_token == claim_token).order_by(WebhookEvent.next_attempt_at).all()
+    db.rollback()
+    return [ClaimedEvent(*row, claim_token=claim_token) for row in rows]
+
+
+def group_events(events: List[ClaimedEvent]) -> List[List[ClaimedEvent]]:
+    """Split a claimed batch into groups that are applied as one."""
+    groups: Dict[str, List[ClaimedEvent]] = {}
+    singles = []
+    for event in events:
+        if event.coalesce_key is None:
+            singles.append([event])
+        else:
+            groups.setdefault(event.coalesce_key, []).append(event)
+    return singles + list(groups.values())
+
+
+def _is_latest(db: Session, group: List[ClaimedEvent], newest: ClaimedEvent) -> bool:
+    # `created` has one-second resolution, so a tie leaves the order unknown
+    if newest.coalesce_key is None:
+        return True
+    if newest.event_created is None:
+        return False
+    if any(event is not newest and event.event_created == newest.event_created for event in group):
+        return False
+    applied_since = db.query(WebhookEvent.id).filter(
+        WebhookEvent.coalesce_key == newest.coalesce_key,
+        WebhookEvent.status == WebhookEventStatus.DONE,
+        WebhookEvent.event_created >= newest.event_created
+    ).first()
+    return applied_since is None
+
+
+def process_events(db: Session, group: List[ClaimedEvent]):
+    """Apply a group from group_events; raises if it should be retried.
+
+    Only the newest event of a coalesced group is applied; the rest are
+    superseded by it. Handlers must be idempotent: an event is applied at
+    least once.
+    """
+    newest = max(group, key=lambda event: event.event_created or 0)
+    data = json.loads(newest.payload)
+    HANDLERS[(newest.source, newest.type)](db, data['data']['object'], _is_latest(db, group, newest))
+
+
+def complete_events(db: Session, group: List[ClaimedEvent]) -> int:
+    """Mark claimed events as done; returns how many still held their lease."""
+    claim_token = group[0].claim_token
+    updated = db.query(WebhookEvent).filter(
+        WebhookEvent.id.in_([event.id for event in group]),
+        WebhookEvent.claim_token == claim_token
+    ).update({
+        WebhookEvent.status: WebhookEventStatus.DONE,
+        WebhookEvent.processed_at: datetime.utcnow(),
+        WebhookEvent.locked_until: None,
+        WebhookEvent.last_error: None,
+    }, synchronize_session=False)
+    db.commit()
+    return updated
+
+
+def retry_backoff(attempts: int) -> float:
+    # Full jitter: anywhere up to the exponential bound
+    bound = settings.WEBHOOK_RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1))
+    return random.uniform(0, min(bound, settings.WEBHOOK_RETRY_BACKOFF_MAX_SECONDS))
+
+
+def retry_events(db: Session, group: List[ClaimedEvent], error: str) -> bool:
+    """Schedule a failed group for another attempt.
+
+    Returns False once WEBHOOK_MAX_ATTEMPTS is reached; the events are then
+    left FAILED for an operator (scripts/process_webhooks.py --requeue-failed).
+    """
+    attempts = max(event.attempts for event in group)
+    retry = attempts < settings.WEBHOOK_MAX_ATTEMPTS
+    values = {
+        WebhookEvent.locked_until: None,
+        WebhookEvent.last_error: error[:2000],
+    }
+    if retry:
+        values[WebhookEvent.status] = WebhookEventStatus.PENDING
+        values[WebhookEvent.next_attempt_at] = datetime.utcnow() + timedelta(seconds=retry_backoff(attempts))
+    else:
+        values[WebhookEvent.status] = WebhookEventStatus.FAILED
+    db.query(WebhookEvent).filter(
+        WebhookEvent.id.in_([event.id for event in group]),
+        WebhookEvent.claim_token == group[0].claim_token
+    ).update(values, synchronize_session=False)
+    db.commit()
+    return retry
+
+
+def requeue_failed_events(db: Session) -> int:
+    """Give every FAILED event a fresh set of attempts."""
+    requeued = db.query(WebhookEvent).filter(
+        WebhookEvent.status == WebhookEventStatus.FAILED
+    ).update({
+        WebhookEvent.status: WebhookEventStatus.PENDING,
+        WebhookEvent.attempts: 0,
+        WebhookEvent.next_attempt_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    return requeued
+
+
+def purge_processed_events(db: Session, older_than: datetime) -> int:
+    """Delete events processed before `older_than`.
+
+    Stripe redelivers for up to three days; keep rows longer than that so
+    late redeliveries are still recognised as duplicates.
+    """
+    deleted = db.query(WebhookEvent).filter(
+        WebhookEvent.status == WebhookEventStatus.DONE,
+        WebhookEvent.processed_at < older_than
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def count_by_status(db: Session) -> Dict[str, int]:
+    """Number of inbox events per status."""
+    rows = db.query(WebhookEvent.status, func.count(WebhookEvent.id)).group_by(WebhookEvent.status).all()
+    counts = {status.value: 0 for status in WebhookEventStatus}
+    counts.update({status.value: count for status, count in rows})
+    return counts
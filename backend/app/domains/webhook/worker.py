@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import logging
+import os
+import threading
+import time
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.domains.webhook import service
+from app.domains.webhook.service import ClaimedEvent
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookWorker:
+    """Drains the webhook inbox in the background of an API process.
+
+    A dispatcher thread claims due events in batches of WEBHOOK_BATCH_SIZE
+    and applies them on WEBHOOK_WORKER_CONCURRENCY threads, one session per
+    event (or per group of coalesced events). When the inbox is empty it
+    sleeps WEBHOOK_POLL_SECONDS, or until notify() reports a newly recorded
+    event. Failed events are retried with backoff by the worker that next
+    claims them.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.batches = 0
+        self.processed = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.gave_up = 0
+        self.lost_leases = 0
+        self.last_batch_at: Optional[float] = None
+
+    def reset_after_fork(self):
+        # Threads do not survive fork; the child starts its own from lifespan
+        self._reset()
+
+    def _executor_for_batches(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.WEBHOOK_WORKER_CONCURRENCY, thread_name_prefix="webhook"
+            )
+        return self._executor
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="webhook-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Finish the current batch and stop; unclaimed events stay in the inbox."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._thread = None
+
+    def notify(self):
+        """Wake the dispatcher after an event was recorded."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            # Cleared before polling, so a notify() during the batch is kept
+            self._wake.clear()
+            try:
+                claimed = self.drain_once()
+            except Exception:
+                logger.exception("Polling the webhook inbox failed")
+                claimed = 0
+            if claimed < settings.WEBHOOK_BATCH_SIZE:
+                self._wake.wait(settings.WEBHOOK_POLL_SECONDS)
+
+    def drain_once(self) -> int:
+        """Claim one batch and apply it; returns the number of events claimed."""
+        db = SessionLocal()
+        try:
+            events = service.claim_events(db, settings.WEBHOOK_BATCH_SIZE, settings.WEBHOOK_LEASE_SECONDS)
+        finally:
+            db.close()
+        if events:
+            list(self._executor_for_batches().map(self._apply, service.group_events(events)))
+            with self._lock:
+                self.batches += 1
+                self.last_batch_at = time.monotonic()
+        return len(events)
+
+    def _apply(self, group: List[ClaimedEvent]):
+        db = SessionLocal()
+        try:
+            try:
+                service.process_events(db, group)
+            except Exception as e:
+                db.rollback()
+                retry = service.retry_events(db, group, f"{type(e).__name__}: {e}")
+                logger.warning(
+                    "Webhook event %s (%s, %d in group) failed on attempt %d%s: %s", group[-1].id,
+                    group[-1].type, len(group), max(event.attempts for event in group),
+                    "" if retry else ", giving up", e
+                )
+                with self._lock:
+                    if retry:
+                        self.retried += len(group)
+                    else:
+                        self.gave_up += len(group)
+                return
+            completed = service.complete_events(db, group)
+            with self._lock:
+                self.processed += len(group)
+                self.coalesced += len(group) - 1
+                self.lost_leases += len(group) - completed
+        finally:
+            db.close()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            last_batch_at = self.last_batch_at
+            return {
+                "running": self._thread is not None,
+                "concurrency": settings.WEBHOOK_WORKER_CONCURRENCY,
+                "batches": self.batches,
+                "processed": self.processed,
+                "coalesced": self.coalesced,
+                "retried": self.retried,
+                "gave_up": self.gave_up,
+                "lost_leases": self.lost_leases,
+                "seconds_since_batch": round(time.monotonic() - last_batch_at, 3) if last_batch_at is not None else None,
+            }
+
+
+webhook_worker = WebhookWorker()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=webhook_worker.reset_after_fork)
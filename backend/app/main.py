@@ -1,24 +1,41 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.db import Base, engine
+from app.core.db import PRIMARY_STICKY_HEADER, get_pool_stats, get_read_pool_stats, mark_primary_sticky
+from app.core.cache import get_cache_stats
+from app.core.security import password_hasher
+from app.core.stripe_gateway import stripe_gateway
+from app.api.deps import require_metrics_token, user_cache
+from app.domains.auth.token_versions import token_versions
 from app.domains.auth.router import router as auth_router
 from app.domains.creator.router import router as creator_router
 from app.domains.support.router import router as support_router
 from app.domains.payment.router import router as payment_router
+from app.domains.payment.status_refresh import account_status_refresher
+from app.domains.webhook.worker import webhook_worker
 
-# Import startup script
-import app.startup
+# The schema is managed by migrations (scripts/migrate.py), applied once
+# per release before the workers start.
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each worker process drains the webhook inbox in the background
+    if settings.WEBHOOK_WORKER_ENABLED:
+        webhook_worker.start()
+    yield
+    await run_in_threadpool(webhook_worker.stop)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
     title="Artison API",
     description="Platform for supporting creators",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -28,8 +45,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[PRIMARY_STICKY_HEADER],
 )
 
+
+# Pin callers to the primary database right after they write
+@app.middleware("http")
+async def primary_sticky_middleware(request: Request, call_next):
+    response = await call_next(request)
+    mark_primary_sticky(request, response)
+    return response
+
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(creator_router)
@@ -45,3 +72,19 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+def metrics():
+    """Per-worker runtime counters for capacity planning."""
+    return {
+        "db_pool": get_pool_stats(),
+        "db_read_pool": get_read_pool_stats(),
+        "cache": get_cache_stats(),
+        "user_cache": user_cache.snapshot(),
+        "token_versions": token_versions.snapshot(),
+        "password_hasher": password_hasher.snapshot(),
+        "stripe": stripe_gateway.snapshot(),
+        "account_status_refresh": account_status_refresher.snapshot(),
+        "webhooks": webhook_worker.snapshot(),
+    }
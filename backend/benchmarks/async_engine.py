@@ -0,0 +1,207 @@
+"""
+Compare the sync and async engines behind the async routes
+
+Concurrent clients run the database steps of login, checkout and webhook
+intake through run_db, once on sync sessions in the threadpool and once on
+the async engine, the two paths app.core.db.get_db_runner chooses between.
+Password hashing and Stripe are left out, so only the engines differ.
+
+    python -m benchmarks.async_engine --duration 10 --concurrency 64
+    python -m benchmarks.async_engine --database-url postgresql://... --json engines.json
+
+--database-url must point to an empty scratch database.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.db import Base, get_async_database_url, threadpool_runner
+from app.domains.auth import service as auth_service
+from app.domains.auth.models import User
+from app.domains.creator.models import CreatorProfile
+from app.domains.payment.models import StripeAccount
+from app.domains.support import service as support_service
+from app.domains.webhook import service as webhook_service
+from benchmarks.common import summarize, write_json
+
+OPERATIONS = ("login", "checkout", "webhook")
+
+
+def engine_args(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    return {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+
+
+def seed(session_factory, creators: int, supporters: int) -> dict:
+    """Insert creators with profiles and payouts set up, and supporters."""
+    db = session_factory()
+    creator_ids = [str(uuid.uuid4()) for _ in range(creators)]
+    supporter_ids = [str(uuid.uuid4()) for _ in range(supporters)]
+
+    db.bulk_insert_mappings(User, [
+        {"id": user_id, "email": f"{user_id}@example.com", "username": user_id,
+         "hashed_password": "x", "is_creator": user_id in creator_ids, "is_active": True}
+        for user_id in creator_ids + supporter_ids
+    ])
+    db.bulk_insert_mappings(CreatorProfile, [
+        {"user_id": creator_id, "display_name": f"Creator {i}"}
+        for i, creator_id in enumerate(creator_ids)
+    ])
+    db.bulk_insert_mappings(StripeAccount, [
+        {"user_id": creator_id, "stripe_account_id": f"acct_{i}",
+         "charges_enabled": True, "payouts_enabled": True, "details_submitted": True}
+        for i, creator_id in enumerate(creator_ids)
+    ])
+    db.commit()
+    db.close()
+    return {"creators": creator_ids, "supporters": supporter_ids}
+
+
+async def login(run_db, rng: random.Random, data: dict):
+    await run_db(auth_service.find_user_for_login, f"{rng.choice(data['supporters'])}@example.com")
+
+
+async def checkout(run_db, rng: random.Random, data: dict):
+    draft = await run_db(
+        support_service.start_checkout, rng.choice(data["supporters"]), rng.choice(data["creators"]),
+        rng.randint(150, 10000), None, "https://example.com/ok", "https://example.com/cancel"
+    )
+    await run_db(support_service.attach_checkout_session, draft.support_id, f"cs_{draft.support_id}")
+
+
+async def webhook(run_db, rng: random.Random, data: dict):
+    event_id = f"evt_{uuid.uuid4().hex}"
+    stripe_event = {
+        "id": event_id,
+        "type": "checkout.session.completed",
+        "created": int(time.time()),
+        "data": {"object": {"client_reference_id": str(uuid.uuid4())}},
+    }
+    await run_db(webhook_service.record_event, webhook_service.PLATFORM, stripe_event, json.dumps(stripe_event))
+
+
+STEPS = {"login": login, "checkout": checkout, "webhook": webhook}
+
+
+async def drive(open_runner, data: dict, args) -> dict:
+    """Run the mix from --concurrency clients for --duration seconds."""
+    results = {operation: [] for operation in OPERATIONS}
+    errors = {operation: 0 for operation in OPERATIONS}
+    deadline = time.perf_counter() + args.duration
+
+    async def client(index: int):
+        rng = random.Random(args.seed + index)
+        while time.perf_counter() < deadline:
+            operation = rng.choice(OPERATIONS)
+            started = time.perf_counter()
+            try:
+                async with open_runner() as run_db:
+                    await STEPS[operation](run_db, rng, data)
+            except SQLAlchemyError:
+                errors[operation] += 1
+                continue
+            results[operation].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        operation: summarize(results[operation], elapsed, errors[operation])
+        for operation in OPERATIONS
+    }
+
+
+def run_sync_engine(url: str, data: dict, args) -> dict:
+    engine = create_engine(url, **engine_args(url))
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    @contextlib.asynccontextmanager
+    async def open_runner():
+        db = session_factory()
+        try:
+            yield threadpool_runner(db)
+        finally:
+            await run_in_threadpool(db.close)
+
+    try:
+        return asyncio.run(drive(open_runner, data, args))
+    finally:
+        engine.dispose()
+
+
+def run_async_engine(url: str, data: dict, args) -> dict:
+    engine = create_async_engine(get_async_database_url(url), **engine_args(url))
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    @contextlib.asynccontextmanager
+    async def open_runner():
+        async with session_factory() as db:
+            yield db.run_sync
+
+    async def main():
+        try:
+            return await drive(open_runner, data, args)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="empty scratch database (default: temporary SQLite file)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per engine")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent clients")
+    parser.add_argument("--creators", type=int, default=50)
+    parser.add_argument("--supporters", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    scratch_file = None
+    url = args.database_url
+    if url is None:
+        scratch_file = tempfile.mktemp(prefix="artison-engines-", suffix=".db")
+        url = f"sqlite:///{scratch_file}"
+
+    setup_engine = create_engine(url)
+    Base.metadata.create_all(bind=setup_engine)
+    data = seed(sessionmaker(bind=setup_engine), args.creators, args.supporters)
+    setup_engine.dispose()
+
+    report = {}
+    try:
+        for name, run in (("sync", run_sync_engine), ("async", run_async_engine)):
+            print(f"Running {name} engine for {args.duration}s...")
+            report[name] = run(url, data, args)
+    finally:
+        if scratch_file:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(scratch_file + suffix):
+                    os.remove(scratch_file + suffix)
+
+    print(f"\n{'engine':<8}{'step':<10}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, operations in report.items():
+        for operation, row in operations.items():
+            print(f"{name:<8}{operation:<10}{row['rps']:>10}{row['p50_ms']:>10}"
+                  f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['errors']:>8}")
+
+    write_json(args.json, report)
+
+
+if __name__ == "__main__":
+    main()
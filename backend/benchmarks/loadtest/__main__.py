@@ -0,0 +1,202 @@
+"""
+End-to-end HTTP load test of app.main:app against a local fake Stripe
+
+Seeds a database with scripts/generate_dataset.py, serves the app, then
+drives login, public profile, public stats, checkout and both webhook
+routes with a weighted mix for a fixed time. Results per endpoint (RPS,
+p50/p95/p99, status codes) are printed and written as JSON to diff
+between versions.
+
+    python -m benchmarks.loadtest --server uvicorn --workers 4 --concurrency 64 --output before.json
+    python -m benchmarks.loadtest --server inprocess --mix profile=1,stats=1 --duration 10
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --creators 500 --supporters 10000
+
+--server uvicorn starts `uvicorn app.main:app` with the given workers;
+--server inprocess calls the app through httpx's ASGI transport. With
+--base-url the server is yours: seed it with scripts/generate_dataset.py
+and start it with STRIPE_API_BASE=http://127.0.0.1:<--stripe-port>, the
+webhook secrets and the metrics token below.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import write_json
+from benchmarks.loadtest.fake_stripe import FakeStripe
+from benchmarks.loadtest.workload import DEFAULT_MIX, Workload, drive, parse_mix
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+SECRET_KEY = "sk_test_loadtest"
+WEBHOOK_SECRET = "whsec_loadtest"
+CONNECT_WEBHOOK_SECRET = "whsec_loadtest_connect"
+METRICS_TOKEN = "metrics_loadtest"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_database(env: dict, args):
+    subprocess.run(
+        [sys.executable, "scripts/generate_dataset.py", "--supports", str(args.seed_supports),
+         "--creators", str(args.creators), "--supporters", str(args.supporters), "--seed", str(args.seed)],
+        cwd=BACKEND_DIR, env=env, check=True,
+    )
+
+
+def start_uvicorn(env: dict, workers: int) -> tuple:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60s")
+
+
+def print_report(report: dict):
+    print(f"{'endpoint':<18}{'count':>8}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, result in rows:
+        print(
+            f"{name:<18}{result['count']:>8}{result['errors']:>8}{result['rps']:>10.1f}"
+            f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+        )
+
+
+async def run_load(client: httpx.AsyncClient, fake_stripe: FakeStripe, args, mix: dict) -> dict:
+    workload = Workload(
+        client, fake_stripe, args.creators, args.supporters, args.webhook_secret, args.connect_webhook_secret
+    )
+    if "checkout" in mix:
+        await workload.log_in(args.login_pool)
+    report = await drive(workload, mix, args.concurrency, args.duration, args.warmup, args.seed)
+    metrics = await client.get("/metrics", headers={"X-Metrics-Token": args.metrics_token})
+    report["app_metrics"] = metrics.json() if metrics.status_code == 200 else None
+    return report
+
+
+def main(args):
+    mix = parse_mix(args.mix)
+    fake_stripe = FakeStripe(port=args.stripe_port, latency_ms=args.stripe_latency_ms,
+                             jitter_ms=args.stripe_jitter_ms, seed=args.seed).start()
+
+    database_url = args.database_url
+    if args.base_url is None and database_url is None:
+        database_url = f"sqlite:///{tempfile.mkdtemp(prefix='artison-loadtest-')}/loadtest.db"
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url or "",
+        STRIPE_API_BASE=fake_stripe.url,
+        STRIPE_SECRET_KEY=SECRET_KEY,
+        STRIPE_WEBHOOK_SECRET=args.webhook_secret,
+        STRIPE_CONNECT_WEBHOOK_SECRET=args.connect_webhook_secret,
+        METRICS_TOKEN=args.metrics_token,
+    )
+    if args.base_url is None and not args.skip_seed:
+        print("Seeding database...")
+        seed_database(env, args)
+
+    process = None
+    lifespan = contextlib.nullcontext()
+    try:
+        if args.base_url is not None:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        elif args.server == "uvicorn":
+            process, base_url = start_uvicorn(env, args.workers)
+            client = httpx.AsyncClient(
+                base_url=base_url, timeout=args.timeout,
+                limits=httpx.Limits(max_connections=args.concurrency)
+            )
+        else:
+            # The app reads its settings at import time
+            os.environ.update(env)
+            from app.main import app
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+            )
+            # The ASGI transport skips startup/shutdown; run them for the webhook worker
+            lifespan = app.router.lifespan_context(app)
+
+        print(f"Running {args.concurrency} clients for {args.duration}s (+{args.warmup}s warmup)...")
+
+        async def session():
+            async with lifespan, client:
+                return await run_load(client, fake_stripe, args, mix)
+
+        report = asyncio.run(session())
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        fake_stripe.stop()
+
+    report["config"] = {
+        "server": "external" if args.base_url else args.server,
+        "workers": args.workers if args.server == "uvicorn" and not args.base_url else None,
+        "database": (database_url or "external").split(":", 1)[0],
+        "mix": mix,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "seed_supports": None if args.skip_seed or args.base_url else args.seed_supports,
+        "stripe_latency_ms": args.stripe_latency_ms,
+        "stripe_jitter_ms": args.stripe_jitter_ms,
+    }
+    report["stripe_calls"] = dict(fake_stripe.calls)
+    print_report(report)
+    write_json(args.output, report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP load test of the API with a fake Stripe")
+    parser.add_argument("--server", choices=["uvicorn", "inprocess"], default="uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--base-url", help="test an already running server instead")
+    parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an already generated --database-url")
+    parser.add_argument("--seed-supports", type=int, default=20000, help="dataset size")
+    parser.add_argument("--creators", type=int, help="default: as scripts/generate_dataset.py")
+    parser.add_argument("--supporters", type=int, help="default: as scripts/generate_dataset.py")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, e.g. profile=5,stats=3")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds first")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout")
+    parser.add_argument("--login-pool", type=int, default=20, help="supporters logged in for checkout")
+    parser.add_argument("--stripe-port", type=int, default=12111)
+    parser.add_argument("--stripe-latency-ms", type=float, default=0.0)
+    parser.add_argument("--stripe-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--webhook-secret", default=WEBHOOK_SECRET)
+    parser.add_argument("--connect-webhook-secret", default=CONNECT_WEBHOOK_SECRET)
+    parser.add_argument("--metrics-token", default=METRICS_TOKEN, help="for app metrics in the report")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+    args.creators = args.creators or max(10, args.seed_supports // 200)
+    args.supporters = args.supporters or max(100, args.seed_supports // 10)
+    main(args)
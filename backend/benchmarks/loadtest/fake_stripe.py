@@ -0,0 +1,195 @@
+"""
+Local stand-in for the Stripe API endpoints the backend calls
+
+Implements just enough of /v1 for stripe-python (checkout sessions,
+accounts, account links) with configurable latency, so checkout and
+Connect flows can be load tested offline. Point the app at it with
+STRIPE_API_BASE.
+
+    python -m benchmarks.loadtest.fake_stripe --port 12111 --latency-ms 150
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Optional
+from urllib.parse import parse_qs
+
+
+class FakeStripe:
+    """In-memory Stripe state plus an HTTP server serving it."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = count(1)
+        self.sessions = {}  # checkout session id -> session object
+        self.accounts = {}  # account id -> account object
+        self.calls = Counter()
+
+        fake = self
+
+        class Handler(FakeStripeHandler):
+            stripe = fake
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeStripe":
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-stripe", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            with self.lock:
+                ms = self.rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            time.sleep(max(ms, 0) / 1000)
+
+    def new_id(self, prefix: str) -> str:
+        with self.lock:
+            return f"{prefix}_fake{next(self.ids):08d}"
+
+    def client_reference_id(self, session_id: str) -> Optional[str]:
+        session = self.sessions.get(session_id)
+        return session["client_reference_id"] if session else None
+
+    def account(self, account_id: str) -> dict:
+        # Accounts not created through the fake (seeded data) count as onboarded
+        return self.accounts.get(account_id) or {
+            "id": account_id,
+            "object": "account",
+            "charges_enabled": True,
+            "payouts_enabled": True,
+            "details_submitted": True,
+        }
+
+    # Routes: (method, path parts) -> (status, body)
+
+    def handle(self, method: str, parts: list, form: dict):
+        if parts == ["checkout", "sessions"] and method == "POST":
+            session_id = self.new_id("cs_test")
+            session = {
+                "id": session_id,
+                "object": "checkout.session",
+                "url": f"https://checkout.stripe.test/pay/{session_id}",
+                "client_reference_id": form.get("client_reference_id"),
+                "payment_intent": self.new_id("pi"),
+                "status": "open",
+            }
+            self.sessions[session_id] = session
+            return "checkout.sessions.create", 200, session
+        if parts[:2] == ["checkout", "sessions"] and len(parts) == 3 and method == "GET":
+            session = self.sessions.get(parts[2])
+            if session is None:
+                return "checkout.sessions.retrieve", 404, missing("checkout session", parts[2])
+            return "checkout.sessions.retrieve", 200, session
+
+        if parts == ["accounts"] and method == "POST":
+            account_id = self.new_id("acct")
+            account = {
+                "id": account_id,
+                "object": "account",
+                "email": form.get("email"),
+                "charges_enabled": False,
+                "payouts_enabled": False,
+                "details_submitted": False,
+            }
+            self.accounts[account_id] = account
+            return "accounts.create", 200, account
+        if parts[:1] == ["accounts"] and len(parts) == 2:
+            if method == "GET":
+                return "accounts.retrieve", 200, self.account(parts[1])
+            if method == "POST":
+                return "accounts.modify", 200, self.account(parts[1])
+
+        if parts == ["account_links"] and method == "POST":
+            now = int(time.time())
+            return "account_links.create", 200, {
+                "object": "account_link",
+                "url": f"https://connect.stripe.test/setup/{form.get('account')}",
+                "created": now,
+                "expires_at": now + 300,
+            }
+
+        return "unknown", 404, missing("route", "/".join(parts))
+
+
+def missing(kind: str, name: str) -> dict:
+    return {"error": {"type": "invalid_request_error", "message": f"No such {kind}: '{name}'"}}
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, keep-alive
+    # clients see delayed-ACK stalls that are not Stripe's latency
+    disable_nagle_algorithm = True
+    stripe: FakeStripe
+
+    def _dispatch(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        form = {key: values[-1] for key, values in parse_qs(body).items()}
+
+        path = self.path.split("?", 1)[0]
+        parts = [part for part in path.split("/") if part]
+        if parts[:1] == ["v1"]:
+            name, status, payload = self.stripe.handle(method, parts[1:], form)
+        else:
+            name, status, payload = "unknown", 404, missing("route", path)
+
+        self.stripe.delay()
+        with self.stripe.lock:
+            self.stripe.calls[name] += 1
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the fake Stripe API on its own")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean added latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="latency varies uniformly by +/- this")
+    args = parser.parse_args()
+
+    fake = FakeStripe(args.host, args.port, args.latency_ms, args.jitter_ms)
+    print(f"Fake Stripe listening on {fake.url} (set STRIPE_API_BASE={fake.url})")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,196 @@
+"""
+Request scenarios for the HTTP load test and the loop that drives them
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import time
+from collections import Counter, deque
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.loadtest.fake_stripe import FakeStripe
+
+# Matches scripts/generate_dataset.py
+EMAIL_DOMAIN = "bench.example.com"
+PASSWORD = "benchpass123"
+
+SCENARIOS = ["login", "profile", "stats", "checkout", "webhook_checkout", "webhook_account"]
+DEFAULT_MIX = "profile=40,stats=30,login=5,checkout=10,webhook_checkout=10,webhook_account=5"
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "name=weight,..." into weights, rejecting unknown scenarios."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def sign_webhook(payload: bytes, secret: str) -> str:
+    """Build a Stripe-Signature header the way Stripe signs webhook deliveries."""
+    timestamp = int(time.time())
+    signed = f"{timestamp}.".encode() + payload
+    signature = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+class Workload:
+    """One method per scenario; each returns the HTTP status, or None when skipped."""
+
+    def __init__(self, client: httpx.AsyncClient, fake_stripe: FakeStripe, creators: int,
+                 supporters: int, webhook_secret: str, connect_webhook_secret: str):
+        self.client = client
+        self.fake_stripe = fake_stripe
+        self.creators = creators
+        self.supporters = supporters
+        self.webhook_secret = webhook_secret
+        self.connect_webhook_secret = connect_webhook_secret
+        # Popular creators get most of the traffic, like their supports
+        self.creator_weights = list(accumulate(1 / (rank ** 1.1) for rank in range(1, creators + 1)))
+        self.tokens: List[str] = []
+        self.open_sessions = deque()
+
+    async def log_in(self, count: int):
+        """Log in the first supporters once, for the authenticated scenarios."""
+        for index in range(min(count, self.supporters)):
+            response = await self.client.post("/auth/login", json={
+                "email": f"supporter{index}@{EMAIL_DOMAIN}", "password": PASSWORD
+            })
+            response.raise_for_status()
+            self.tokens.append(response.json()["access_token"])
+
+    def creator_index(self, rng: random.Random) -> int:
+        return rng.choices(range(self.creators), cum_weights=self.creator_weights)[0]
+
+    async def login(self, rng: random.Random) -> int:
+        response = await self.client.post("/auth/login", json={
+            "email": f"supporter{rng.randrange(self.supporters)}@{EMAIL_DOMAIN}", "password": PASSWORD
+        })
+        return response.status_code
+
+    async def profile(self, rng: random.Random) -> int:
+        response = await self.client.get(f"/creators/profile/benchcreator{self.creator_index(rng)}")
+        return response.status_code
+
+    async def stats(self, rng: random.Random) -> int:
+        response = await self.client.get(f"/support/creator/benchcreator{self.creator_index(rng)}/stats")
+        return response.status_code
+
+    async def checkout(self, rng: random.Random) -> int:
+        response = await self.client.post(
+            "/support/checkout",
+            params={"creator_username": f"benchcreator{self.creator_index(rng)}"},
+            json={
+                "amount": rng.choice([300, 500, 1000, 3000]),
+                "message": "Load test",
+                "success_url": "https://example.com/success",
+                "cancel_url": "https://example.com/cancel",
+            },
+            headers={"Authorization": f"Bearer {rng.choice(self.tokens)}"},
+        )
+        if response.status_code == 200:
+            self.open_sessions.append(response.json()["session_id"])
+        return response.status_code
+
+    async def post_event(self, path: str, secret: str, event_type: str, obj: dict) -> int:
+        payload = json.dumps({
+            "id": f"evt_loadtest{random.getrandbits(64):016x}",
+            "object": "event",
+            "created": int(time.time()),
+            "type": event_type,
+            "data": {"object": obj},
+        }).encode()
+        response = await self.client.post(path, content=payload, headers={
+            "Content-Type": "application/json",
+            "Stripe-Signature": sign_webhook(payload, secret),
+        })
+        return response.status_code
+
+    async def webhook_checkout(self, rng: random.Random) -> Optional[int]:
+        # Completes a session opened by the checkout scenario
+        if not self.open_sessions:
+            return None
+        session = self.fake_stripe.sessions.get(self.open_sessions.popleft())
+        if session is None:
+            return None
+        return await self.post_event(
+            "/support/webhook", self.webhook_secret, "checkout.session.completed",
+            dict(session, status="complete", payment_status="paid")
+        )
+
+    async def webhook_account(self, rng: random.Random) -> int:
+        account = self.fake_stripe.account(f"acct_bench{self.creator_index(rng)}")
+        return await self.post_event(
+            "/payment/webhooks/stripe", self.connect_webhook_secret, "account.updated", account
+        )
+
+
+class Recorder:
+    """Latencies and status codes per scenario."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors = Counter()
+        self.statuses: Dict[str, Counter] = {}
+        self.skipped = Counter()
+
+    def record(self, name: str, status, elapsed: float):
+        self.statuses.setdefault(name, Counter())[str(status)] += 1
+        if isinstance(status, int) and status < 400:
+            self.latencies.setdefault(name, []).append(elapsed)
+        else:
+            self.errors[name] += 1
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name in sorted(set(self.statuses) | set(self.skipped)):
+            endpoints[name] = summarize(self.latencies.get(name, []), elapsed, self.errors[name])
+            endpoints[name]["statuses"] = dict(self.statuses.get(name, {}))
+            endpoints[name]["skipped"] = self.skipped[name]
+        everything = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            "endpoints": endpoints,
+            "overall": summarize(everything, elapsed, sum(self.errors.values())),
+        }
+
+
+async def drive(workload: Workload, mix: Dict[str, float], concurrency: int,
+                duration: float, warmup: float, seed: int) -> dict:
+    """Run concurrency workers for warmup + duration seconds; report the measured part."""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    recorder = Recorder()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    async def worker(index: int):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            request_started = time.perf_counter()
+            try:
+                status = await getattr(workload, name)(rng)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            finished = time.perf_counter()
+            if status is None:
+                # Nothing to do yet; let the other workers run
+                await asyncio.sleep(0)
+                if finished >= measure_from:
+                    recorder.skipped[name] += 1
+            elif finished >= measure_from:
+                recorder.record(name, status, finished - request_started)
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return recorder.report(time.perf_counter() - measure_from)
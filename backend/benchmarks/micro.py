@@ -0,0 +1,313 @@
+"""
+Micro-benchmarks of the hot service-layer functions, with regression gating
+
+Seeds an in-memory SQLite database (or an empty scratch PostgreSQL database)
+and times each function in calibrated rounds, reporting the median time per
+call. Results can be saved as a named baseline and later runs compared
+against it; compare exits with status 1 when any benchmark got slower than
+the threshold, so it can gate CI.
+
+    python -m benchmarks.micro run --save-baseline main
+    python -m benchmarks.micro run --compare main --threshold 15
+    python -m benchmarks.micro run --database-url postgresql://... --output pg.json
+    python -m benchmarks.micro compare main current.json
+
+Baselines live in benchmarks/baselines/<name>.json. Only compare results
+from the same machine and database.
+"""
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict
+
+import sqlalchemy
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.bulk import insert_rows
+from app.core.config import settings
+from app.core.db import Base
+from app.core.security import get_password_hash, verify_password
+from app.domains.auth import service as auth_service
+from app.domains.auth.models import User
+from app.domains.auth.schemas import UserCreate
+from app.domains.creator import service as creator_service
+from app.domains.creator.models import CreatorProfile, PlatformLink
+from app.domains.payment.models import StripeAccount  # noqa: F401 (registers table)
+from app.domains.support import aggregates
+from app.domains.support import service as support_service
+from app.domains.support.models import Support, PaymentStatus
+from benchmarks.common import write_json
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+PASSWORD = "benchpass123"
+
+
+def seed(session_factory, creators: int, supporters: int, supports: int, seed_value: int) -> dict:
+    """Insert users, profiles, links and supports; the first creator gets the most supports."""
+    rng = random.Random(seed_value)
+    creator_ids = [str(uuid.uuid4()) for _ in range(creators)]
+    supporter_ids = [str(uuid.uuid4()) for _ in range(supporters)]
+    hashed_password = get_password_hash(PASSWORD)
+    now = datetime.utcnow()
+
+    db = session_factory()
+    try:
+        connection = db.connection()
+        insert_rows(connection, User.__table__, [
+            {"id": user_id, "email": f"{user_id}@example.com", "username": f"micro{index}",
+             "hashed_password": hashed_password, "is_active": True,
+             "is_creator": index < creators, "token_version": 0}
+            for index, user_id in enumerate(creator_ids + supporter_ids)
+        ])
+        profiles, links = [], []
+        for index, creator_id in enumerate(creator_ids):
+            profile_id = str(uuid.uuid4())
+            profiles.append({"id": profile_id, "user_id": creator_id, "display_name": f"Creator {index}",
+                             "bio": "Benchmark creator"})
+            links.extend(
+                {"id": str(uuid.uuid4()), "creator_profile_id": profile_id, "platform_name": platform_name,
+                 "platform_url": f"https://example.com/{platform_name.lower()}/{index}", "display_order": order}
+                for order, platform_name in enumerate(["YouTube", "Twitter", "Website"])
+            )
+        insert_rows(connection, CreatorProfile.__table__, profiles)
+        insert_rows(connection, PlatformLink.__table__, links)
+
+        weights = [1 / (rank ** 1.1) for rank in range(1, creators + 1)]
+        statuses = [PaymentStatus.COMPLETED, PaymentStatus.PENDING, PaymentStatus.FAILED]
+        rows = []
+        for creator_id in rng.choices(creator_ids, weights=weights, k=supports):
+            status = rng.choices(statuses, weights=[85, 10, 5])[0]
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "supporter_id": rng.choice(supporter_ids),
+                "creator_id": creator_id,
+                "amount": rng.choice([300, 500, 1000, 3000]),
+                "message": None,
+                "payment_status": status,
+                "completed_at": now - timedelta(minutes=rng.randint(0, 500000))
+                if status == PaymentStatus.COMPLETED else None,
+            })
+        insert_rows(connection, Support.__table__, rows)
+        db.commit()
+
+        after = None
+        while True:
+            after = aggregates.rebuild_creator_aggregates(db, after, 1000)
+            if after is None:
+                break
+        db.execute(sqlalchemy.text("ANALYZE"))
+        db.commit()
+    finally:
+        db.close()
+
+    return {"hot_creator_id": creator_ids[0], "hot_creator_username": "micro0"}
+
+
+def build_benchmarks(session_factory, data: dict) -> Dict[str, Callable[[], None]]:
+    """Map benchmark names to zero-argument callables; each uses a fresh session like a request."""
+    creator_id = data["hot_creator_id"]
+    username = data["hot_creator_username"]
+    hashed_password = get_password_hash(PASSWORD)
+    emails = (f"new{n}-{uuid.uuid4().hex[:8]}@example.com" for n in itertools.count())
+
+    with session_factory() as db:
+        user = db.query(User).filter(User.id == creator_id).one()
+        token = auth_service.create_token(user)
+        _, cursor = support_service.get_creator_supports(db, creator_id, limit=20)
+
+    def with_session(fn):
+        def run():
+            with session_factory() as db:
+                fn(db)
+        return run
+
+    return {
+        "get_creator_stats": with_session(lambda db: support_service.get_creator_stats(db, creator_id)),
+        "get_creator_supports": with_session(
+            lambda db: support_service.get_creator_supports(db, creator_id, limit=20)
+        ),
+        "get_creator_supports_page2": with_session(
+            lambda db: support_service.get_creator_supports(db, creator_id, limit=20, cursor=cursor)
+        ),
+        "get_creator_profile_by_username": with_session(
+            lambda db: creator_service.get_creator_profile_by_username(db, username)
+        ),
+        "build_public_profile": with_session(lambda db: creator_service.build_public_profile(db, username)),
+        "build_public_creator_stats": with_session(
+            lambda db: support_service.build_public_creator_stats(db, username)
+        ),
+        "create_user": with_session(
+            lambda db: auth_service.create_user(db, UserCreate(email=next(emails), password=PASSWORD))
+        ),
+        "verify_password": lambda: verify_password(PASSWORD, hashed_password),
+        "jwt_encode": lambda: auth_service.create_token(user),
+        "jwt_decode": lambda: auth_service.verify_token(token),
+    }
+
+
+def measure(fn: Callable[[], None], rounds: int, round_time: float) -> dict:
+    """Time fn in rounds of enough calls to last round_time; report per-call seconds."""
+    # Warm up caches, statement compilation and lazy imports for one round,
+    # and size the rounds from how many calls fit in it
+    calls = 0
+    started = time.perf_counter()
+    while calls == 0 or time.perf_counter() - started < round_time:
+        fn()
+        calls += 1
+    iterations = max(1, round(calls * round_time / (time.perf_counter() - started)))
+
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - started) / iterations)
+
+    median = statistics.median(per_call)
+    return {
+        "rounds": rounds,
+        "iterations": iterations,
+        "min": min(per_call),
+        "median": median,
+        "mean": statistics.mean(per_call),
+        "stdev": statistics.stdev(per_call) if rounds > 1 else 0.0,
+        "ops": 1 / median,
+    }
+
+
+def environment(engine) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "database": engine.dialect.name,
+        "password_hash_rounds": settings.PASSWORD_HASH_ROUNDS,
+    }
+
+
+def run(args) -> dict:
+    if args.database_url:
+        engine = create_engine(args.database_url)
+        if inspect(engine).has_table("users"):
+            sys.exit("The benchmark database must be empty; it is dropped afterwards.")
+    else:
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    try:
+        print(f"Seeding {args.supports} supports on {engine.dialect.name}...")
+        data = seed(session_factory, args.creators, args.supporters, args.supports, args.seed)
+        benchmarks = build_benchmarks(session_factory, data)
+
+        results = {}
+        for name, fn in benchmarks.items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(fn, args.rounds, args.round_time)
+            result = results[name]
+            print(f"{name:<34}{result['median'] * 1e6:>12.1f} us{result['ops']:>12.0f} ops/s"
+                  f"  (+/-{result['stdev'] / result['median'] * 100:.1f}%)")
+    finally:
+        if args.database_url:
+            Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    return {
+        "environment": environment(engine),
+        "dataset": {"creators": args.creators, "supporters": args.supporters,
+                    "supports": args.supports, "seed": args.seed},
+        "benchmarks": results,
+    }
+
+
+def load_results(name_or_path: str) -> dict:
+    path = Path(name_or_path)
+    if not path.suffix:
+        path = BASELINE_DIR / f"{name_or_path}.json"
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Print median changes; return the number of regressions beyond threshold percent."""
+    for key in ("database", "python", "machine"):
+        before, after = baseline["environment"].get(key), current["environment"].get(key)
+        if before != after:
+            print(f"warning: {key} differs ({before} vs {after}); timings may not be comparable")
+
+    regressions = 0
+    print(f"{'benchmark':<34}{'baseline us':>13}{'current us':>13}{'change':>10}")
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            print(f"{name:<34}{'-':>13}{result['median'] * 1e6:>13.1f}{'new':>10}")
+            continue
+        change = (result["median"] / before["median"] - 1) * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<34}{before['median'] * 1e6:>13.1f}{result['median'] * 1e6:>13.1f}{change:>+9.1f}%{flag}")
+    for name in baseline["benchmarks"].keys() - current["benchmarks"].keys():
+        print(f"{name:<34}{'(not run)':>13}")
+
+    print(f"{regressions} regression(s) beyond {threshold:g}%")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service-layer micro-benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--database-url", help="empty scratch database (default: in-memory SQLite)")
+    run_parser.add_argument("--supports", type=int, default=20000)
+    run_parser.add_argument("--creators", type=int, default=100)
+    run_parser.add_argument("--supporters", type=int, default=2000)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--rounds", type=int, default=7)
+    run_parser.add_argument("--round-time", type=float, default=0.1, help="seconds per round")
+    run_parser.add_argument("--filter", help="only benchmarks whose name contains this")
+    run_parser.add_argument("--output", help="write results as JSON")
+    run_parser.add_argument("--save-baseline", metavar="NAME", help="store results as a named baseline")
+    run_parser.add_argument("--compare", metavar="BASELINE", help="baseline name or JSON path to compare with")
+    run_parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown in percent")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline", help="baseline name or JSON path")
+    compare_parser.add_argument("current", help="baseline name or JSON path")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown in percent")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(1 if compare(load_results(args.baseline), load_results(args.current), args.threshold) else 0)
+
+    results = run(args)
+    write_json(args.output, results)
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        write_json(str(BASELINE_DIR / f"{args.save_baseline}.json"), results)
+        print(f"Saved baseline {args.save_baseline}")
+    if args.compare:
+        sys.exit(1 if compare(load_results(args.compare), results, args.threshold) else 0)
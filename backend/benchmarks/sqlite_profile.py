@@ -0,0 +1,175 @@
+"""
+Compare the default and production SQLite profiles under mixed load
+
+Reader threads call get_creator_stats while writer threads insert pending
+supports and complete them, mimicking checkout inserts and webhook commits.
+
+    python -m benchmarks.sqlite_profile --duration 10 --readers 8 --writers 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.db import Base, SQLiteWriteSerializer, configure_sqlite_connection
+from app.domains.auth.models import User
+from app.domains.creator.models import CreatorProfile
+from app.domains.payment.models import StripeAccount  # noqa: F401 (registers table)
+from app.domains.support import service as support_service
+from app.domains.support.models import Support, PaymentStatus
+from benchmarks.common import summarize, write_json
+
+
+def build_session_factory(path: str, profile: str):
+    """Create an engine and session factory the way app.core.db would."""
+    url = f"sqlite:///{path}"
+    if profile == "production":
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", configure_sqlite_connection)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        SQLiteWriteSerializer(settings.SQLITE_BUSY_TIMEOUT_MS / 1000).install(session_factory)
+    else:
+        engine = create_engine(url)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return engine, session_factory
+
+
+def seed(session_factory, creators: int, supporters: int, supports: int) -> tuple:
+    """Insert users, profiles and completed supports; return (creator_ids, supporter_ids)."""
+    db = session_factory()
+    creator_ids = [str(uuid.uuid4()) for _ in range(creators)]
+    supporter_ids = [str(uuid.uuid4()) for _ in range(supporters)]
+    now = datetime.utcnow()
+
+    db.bulk_insert_mappings(User, [
+        {"id": user_id, "email": f"{user_id}@example.com", "username": user_id,
+         "hashed_password": "x", "is_creator": user_id in creator_ids, "is_active": True}
+        for user_id in creator_ids + supporter_ids
+    ])
+    db.bulk_insert_mappings(CreatorProfile, [
+        {"user_id": creator_id, "display_name": f"Creator {i}"}
+        for i, creator_id in enumerate(creator_ids)
+    ])
+    db.bulk_insert_mappings(Support, [
+        {"id": str(uuid.uuid4()), "supporter_id": random.choice(supporter_ids),
+         "creator_id": random.choice(creator_ids), "amount": random.randint(150, 10000),
+         "payment_status": PaymentStatus.COMPLETED, "completed_at": now}
+        for _ in range(supports)
+    ])
+    db.commit()
+    db.close()
+    return creator_ids, supporter_ids
+
+
+def run_profile(profile: str, args) -> dict:
+    """Run the mixed workload against a fresh database file."""
+    path = tempfile.mktemp(prefix=f"artison-{profile}-", suffix=".db")
+    engine, session_factory = build_session_factory(path, profile)
+    Base.metadata.create_all(bind=engine)
+    creator_ids, supporter_ids = seed(session_factory, args.creators, args.supporters, args.supports)
+
+    results = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def record(kind: str, started: float, failed: bool):
+        with lock:
+            if failed:
+                errors[kind] += 1
+            else:
+                results[kind].append(time.perf_counter() - started)
+
+    def reader():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            db = session_factory()
+            try:
+                support_service.get_creator_stats(db, random.choice(creator_ids))
+                record("read", started, False)
+            except OperationalError:
+                record("read", started, True)
+            finally:
+                db.close()
+
+    def writer():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            db = session_factory()
+            try:
+                support = Support(
+                    supporter_id=random.choice(supporter_ids),
+                    creator_id=random.choice(creator_ids),
+                    amount=random.randint(150, 10000),
+                    payment_status=PaymentStatus.PENDING
+                )
+                db.add(support)
+                db.commit()
+                support_service.handle_checkout_completed(
+                    db, {"client_reference_id": support.id, "payment_intent": f"pi_{support.id}"}
+                )
+                record("write", started, False)
+            except OperationalError:
+                db.rollback()
+                record("write", started, True)
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    return {
+        kind: summarize(results[kind], elapsed, errors[kind])
+        for kind in ("read", "write")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--creators", type=int, default=50)
+    parser.add_argument("--supporters", type=int, default=500)
+    parser.add_argument("--supports", type=int, default=20000, help="completed supports to seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    report = {}
+    for profile in ("default", "production"):
+        random.seed(args.seed)
+        print(f"Running {profile} profile for {args.duration}s...")
+        report[profile] = run_profile(profile, args)
+
+    print(f"\n{'profile':<12}{'kind':<7}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for profile, kinds in report.items():
+        for kind, row in kinds.items():
+            print(f"{profile:<12}{kind:<7}{row['rps']:>10}{row['p50_ms']:>10}"
+                  f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['errors']:>8}")
+
+    write_json(args.json, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import inspect, text
+
+from app.core.config import settings
+from app.core.db import Base, engine
+# Import every model module so the metadata is complete
+from app.domains.auth import models as auth_models  # noqa: F401
+from app.domains.creator import models as creator_models  # noqa: F401
+from app.domains.payment import models as payment_models  # noqa: F401
+from app.domains.support import models as support_models  # noqa: F401
+from app.domains.webhook import models as webhook_models  # noqa: F401
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_KEY = 7460912843
+
+# Schema that the old create_all-at-startup code produced
+LEGACY_REVISION = "0001"
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL for the migrations without a database connection."""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Leave indexes limited to another dialect out of autogenerate."""
+    ddl_if = getattr(obj, "_ddl_if", None)
+    if type_ == "index" and ddl_if is not None and ddl_if.dialect:
+        return ddl_if.dialect == context.get_context().dialect.name
+    return True
+
+
+def adopt_legacy_schema(connection) -> None:
+    """Stamp databases created by create_all so they start at 0001."""
+    tables = inspect(connection).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        context.get_context().stamp(context.script, LEGACY_REVISION)
+
+
+def run_migrations_online() -> None:
+    """Run migrations, holding an advisory lock on PostgreSQL.
+
+    Concurrent release steps (several instances starting at once) queue on
+    the lock; the ones that get it after the first find the schema at head
+    and do nothing.
+    """
+    connectable = config.attributes.get("connection") or engine
+
+    with connectable.connect() as connection:
+        is_postgres = connection.dialect.name == "postgresql"
+        if is_postgres:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+
+        try:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                include_object=include_object,
+                render_as_batch=True,
+            )
+            with context.begin_transaction():
+                adopt_legacy_schema(connection)
+                context.run_migrations()
+            connection.commit()
+        finally:
+            if is_postgres:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,101 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_creator', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+
+    op.create_table('creator_profiles',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('display_name', sa.String(length=100), nullable=False),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('profile_image_url', sa.String(length=500), nullable=True),
+    sa.Column('header_image_url', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('stripe_accounts',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('stripe_account_id', sa.String(length=255), nullable=False),
+    sa.Column('charges_enabled', sa.Boolean(), nullable=True),
+    sa.Column('payouts_enabled', sa.Boolean(), nullable=True),
+    sa.Column('details_submitted', sa.Boolean(), nullable=True),
+    sa.Column('country', sa.String(length=2), nullable=True),
+    sa.Column('default_currency', sa.String(length=3), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('stripe_account_id')
+    )
+    op.create_table('supports',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('supporter_id', sa.String(length=36), nullable=False),
+    sa.Column('creator_id', sa.String(length=36), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('stripe_payment_intent_id', sa.String(length=255), nullable=True),
+    sa.Column('stripe_checkout_session_id', sa.String(length=255), nullable=True),
+    sa.Column('payment_status', sa.Enum('PENDING', 'COMPLETED', 'FAILED', 'REFUNDED', name='paymentstatus'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['creator_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['supporter_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('stripe_checkout_session_id'),
+    sa.UniqueConstraint('stripe_payment_intent_id')
+    )
+    op.create_table('platform_links',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('creator_profile_id', sa.String(length=36), nullable=False),
+    sa.Column('platform_name', sa.String(length=50), nullable=False),
+    sa.Column('platform_url', sa.String(length=500), nullable=False),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['creator_profile_id'], ['creator_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('platform_links')
+    op.drop_table('supports')
+    op.drop_table('stripe_accounts')
+    op.drop_table('creator_profiles')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    sa.Enum(name='paymentstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,45 @@
+"""support listing indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # Build without blocking checkout inserts on a live table
+        with op.get_context().autocommit_block():
+            op.create_index('ix_supports_creator_status_completed', 'supports',
+                            ['creator_id', 'payment_status', 'completed_at'],
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.create_index('ix_supports_supporter_status_completed', 'supports',
+                            ['supporter_id', 'payment_status', 'completed_at'],
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.create_index('ix_supports_creator_completed_partial', 'supports',
+                            ['creator_id', 'completed_at'],
+                            postgresql_where=sa.text("payment_status = 'COMPLETED'"),
+                            postgresql_include=['amount'],
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index('ix_supports_creator_status_completed', 'supports',
+                        ['creator_id', 'payment_status', 'completed_at'])
+        op.create_index('ix_supports_supporter_status_completed', 'supports',
+                        ['supporter_id', 'payment_status', 'completed_at'])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_supports_creator_completed_partial', table_name='supports')
+    op.drop_index('ix_supports_supporter_status_completed', table_name='supports')
+    op.drop_index('ix_supports_creator_status_completed', table_name='supports')
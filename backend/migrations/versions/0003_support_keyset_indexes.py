@@ -0,0 +1,58 @@
+"""support keyset pagination indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# Listing indexes gain id as the keyset tie-breaker: (new name, old name, columns)
+INDEXES = [
+    ('ix_supports_creator_status_completed_id', 'ix_supports_creator_status_completed',
+     ['creator_id', 'payment_status', 'completed_at', 'id']),
+    ('ix_supports_supporter_status_completed_id', 'ix_supports_supporter_status_completed',
+     ['supporter_id', 'payment_status', 'completed_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # Build the replacements before dropping the old indexes
+        with op.get_context().autocommit_block():
+            for name, old_name, columns in INDEXES:
+                op.create_index(name, 'supports', columns,
+                                postgresql_concurrently=True, if_not_exists=True)
+                op.drop_index(old_name, table_name='supports',
+                              postgresql_concurrently=True, if_exists=True)
+            op.create_index('ix_supports_creator_completed_id_partial', 'supports',
+                            ['creator_id', 'completed_at', 'id'],
+                            postgresql_where=sa.text("payment_status = 'COMPLETED'"),
+                            postgresql_include=['amount'],
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index('ix_supports_creator_completed_partial', table_name='supports',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, old_name, columns in INDEXES:
+            op.create_index(name, 'supports', columns)
+            op.drop_index(old_name, table_name='supports')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_supports_creator_completed_partial', 'supports',
+                        ['creator_id', 'completed_at'],
+                        postgresql_where=sa.text("payment_status = 'COMPLETED'"),
+                        postgresql_include=['amount'])
+        op.drop_index('ix_supports_creator_completed_id_partial', table_name='supports')
+    for name, old_name, columns in INDEXES:
+        op.create_index(old_name, 'supports', columns[:-1])
+        op.drop_index(name, table_name='supports')
@@ -0,0 +1,38 @@
+"""creator support totals
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('creator_support_totals',
+    sa.Column('creator_id', sa.String(length=36), nullable=False),
+    sa.Column('support_count', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['creator_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('creator_id')
+    )
+    # Initial fill in one pass; scripts/rebuild_support_aggregates.py rebuilds
+    # and verifies in chunks afterwards
+    op.execute(
+        "INSERT INTO creator_support_totals (creator_id, support_count, total_amount, updated_at) "
+        "SELECT creator_id, COUNT(id), COALESCE(SUM(amount), 0), CURRENT_TIMESTAMP "
+        "FROM supports WHERE payment_status = 'COMPLETED' GROUP BY creator_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('creator_support_totals')
@@ -0,0 +1,39 @@
+"""creator daily earnings
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('creator_daily_earnings',
+    sa.Column('creator_id', sa.String(length=36), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('support_count', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['creator_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('creator_id', 'day')
+    )
+    # Initial fill in one pass; scripts/rebuild_support_aggregates.py
+    # rebuilds and verifies in chunks afterwards
+    op.execute(
+        "INSERT INTO creator_daily_earnings (creator_id, day, support_count, total_amount, updated_at) "
+        "SELECT creator_id, date(completed_at), COUNT(id), COALESCE(SUM(amount), 0), CURRENT_TIMESTAMP "
+        "FROM supports WHERE payment_status = 'COMPLETED' GROUP BY creator_id, date(completed_at)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('creator_daily_earnings')
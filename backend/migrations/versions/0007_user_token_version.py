@@ -0,0 +1,38 @@
+"""user token version
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+# Partial index for the per-worker reload of bumped versions (token_versions.py)
+INDEX_NAME = 'ix_users_token_version_bumped'
+INDEX_WHERE = sa.text('token_version > 0')
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX_NAME, 'users', ['id', 'token_version'],
+                            postgresql_where=INDEX_WHERE,
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index(INDEX_NAME, 'users', ['id', 'token_version'], sqlite_where=INDEX_WHERE)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,29 @@
+"""webhook event coalescing
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('webhook_events', sa.Column('event_created', sa.BigInteger(), nullable=True))
+    op.add_column('webhook_events', sa.Column('coalesce_key', sa.String(length=255), nullable=True))
+    op.create_index('ix_webhook_events_coalesce_key_status', 'webhook_events', ['coalesce_key', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_events_coalesce_key_status', table_name='webhook_events')
+    with op.batch_alter_table('webhook_events') as batch_op:
+        batch_op.drop_column('coalesce_key')
+        batch_op.drop_column('event_created')
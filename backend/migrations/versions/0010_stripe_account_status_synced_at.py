@@ -0,0 +1,26 @@
+"""stripe account status synced at
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL marks existing rows as stale, so their first status poll refreshes them
+    op.add_column('stripe_accounts', sa.Column('status_synced_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('stripe_accounts') as batch_op:
+        batch_op.drop_column('status_synced_at')
@@ -6,5 +6,8 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 if __name__ == "__main__":
+    from app.core.migrations import run_migrations
+    run_migrations()
+    
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -14,5 +14,8 @@ if __name__ == "__main__":
             print(f"Removing existing database file: {db_file}")
             os.remove(db_file)
     
+    from app.core.migrations import run_migrations
+    run_migrations()
+    
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
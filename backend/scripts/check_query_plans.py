@@ -0,0 +1,191 @@
+"""
+Query-plan regression check for the supports hot paths
+
+Migrates and seeds a scratch database, calls the service functions, and
+runs EXPLAIN on every statement they send against `supports`. Exits with
+status 1 if any plan falls back to a full scan of `supports` or to an
+explicit sort, so it can gate CI.
+
+    python scripts/check_query_plans.py                      # temporary SQLite file
+    python scripts/check_query_plans.py --database-url URL   # empty scratch PostgreSQL database
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+SQLITE_BAD_PLAN = re.compile(r"^SCAN supports\b|TEMP B-TREE")
+
+
+def seed(engine, creators: int, supporters: int, supports: int):
+    """Insert enough rows for the planner to prefer indexes."""
+    from app.domains.auth.models import User
+    from app.domains.creator.models import CreatorProfile
+    from app.domains.support.models import Support, PaymentStatus
+
+    rng = random.Random(1)
+    creator_ids = [str(uuid.uuid4()) for _ in range(creators)]
+    supporter_ids = [str(uuid.uuid4()) for _ in range(supporters)]
+    statuses = [PaymentStatus.COMPLETED, PaymentStatus.PENDING, PaymentStatus.FAILED]
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": user_id, "email": f"{user_id}@example.com", "username": user_id,
+             "hashed_password": "x", "is_active": True, "is_creator": user_id in creator_ids}
+            for user_id in creator_ids + supporter_ids
+        ])
+        conn.execute(CreatorProfile.__table__.insert(), [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "display_name": f"Creator {index}"}
+            for index, user_id in enumerate(creator_ids)
+        ])
+        rows = []
+        for _ in range(supports):
+            status = rng.choices(statuses, weights=[80, 15, 5])[0]
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "supporter_id": rng.choice(supporter_ids),
+                "creator_id": rng.choice(creator_ids),
+                "amount": rng.randint(150, 10000),
+                "payment_status": status,
+                "completed_at": now - timedelta(minutes=rng.randint(0, 500000))
+                if status == PaymentStatus.COMPLETED else None,
+            })
+        conn.execute(Support.__table__.insert(), rows)
+        conn.exec_driver_sql("ANALYZE")
+
+    return creator_ids[0], supporter_ids[0]
+
+
+def explain(engine, statement: str, parameters) -> tuple:
+    """Return (plan lines, problems) for one statement."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            lines = [row[-1] for row in rows]
+            return lines, [line for line in lines if SQLITE_BAD_PLAN.search(line)]
+
+        if engine.dialect.name == "postgresql":
+            raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+            plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+            lines, problems = [], []
+
+            def walk(node, depth=0):
+                label = node["Node Type"]
+                if node.get("Relation Name"):
+                    label += f" on {node['Relation Name']}"
+                if node.get("Index Name"):
+                    label += f" using {node['Index Name']}"
+                lines.append("  " * depth + label)
+                if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "supports":
+                    problems.append(label)
+                if node["Node Type"] in ("Sort", "Incremental Sort"):
+                    problems.append(label)
+                for child in node.get("Plans", []):
+                    walk(child, depth + 1)
+
+            walk(plan)
+            return lines, problems
+
+    raise SystemExit(f"EXPLAIN is not supported for {engine.dialect.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check query plans of the supports hot paths")
+    parser.add_argument("--database-url", help="empty scratch database (default: temporary SQLite file)")
+    parser.add_argument("--supports", type=int, default=20000, help="support rows to seed")
+    args = parser.parse_args()
+
+    scratch_file = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        scratch_file = tempfile.mktemp(prefix="artison-plans-", suffix=".db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{scratch_file}"
+
+    from sqlalchemy import event
+    from app.core.db import engine, SessionLocal
+    from app.core.migrations import run_migrations
+    from app.domains.support import service as support_service
+
+    run_migrations()
+    creator_id, supporter_id = seed(engine, creators=200, supporters=2000, supports=args.supports)
+
+    def next_page(fetch_page):
+        # Fetch the first page, then check the plan of the page after it.
+        # An empty page would pass with a plan that never touched a row.
+        _, cursor = fetch_page(None)
+        if cursor is None:
+            raise SystemExit("Seed data has no second page, increase --supports")
+        rows, next_cursor = fetch_page(cursor)
+        if not rows:
+            raise SystemExit("Second page is empty, check the seed data")
+        return rows, next_cursor
+
+    checks = {
+        "get_creator_supports": lambda db: support_service.get_creator_supports(db, creator_id),
+        "get_creator_supports (page 2)": lambda db: next_page(
+            lambda cursor: support_service.get_creator_supports(db, creator_id, limit=3, cursor=cursor)
+        ),
+        "get_supporter_supports": lambda db: support_service.get_supporter_supports(db, supporter_id),
+        "get_supporter_supports (page 2)": lambda db: next_page(
+            lambda cursor: support_service.get_supporter_supports(db, supporter_id, limit=3, cursor=cursor)
+        ),
+        "get_supporter_supports_with_creators": lambda db: (
+            support_service.get_supporter_supports_with_creators(db, supporter_id)
+        ),
+        "get_supporter_supports_with_creators (page 2)": lambda db: next_page(
+            lambda cursor: support_service.get_supporter_supports_with_creators(
+                db, supporter_id, limit=3, cursor=cursor
+            )
+        ),
+        "get_creator_stats": lambda db: support_service.get_creator_stats(db, creator_id),
+    }
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "supports" in statement:
+            captured.append((statement, parameters))
+
+    failures = 0
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for name, check in checks.items():
+            captured.clear()
+            db = SessionLocal()
+            try:
+                check(db)
+            finally:
+                db.close()
+
+            for statement, parameters in list(captured):
+                lines, problems = explain(engine, statement, parameters)
+                status = "FAIL" if problems else "ok"
+                failures += bool(problems)
+                print(f"[{status}] {name}")
+                for line in lines:
+                    print(f"       {line}")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+        engine.dispose()
+        if scratch_file and os.path.exists(scratch_file):
+            os.remove(scratch_file)
+
+    if failures:
+        print(f"\n{failures} query plan(s) scan or sort the supports table")
+        sys.exit(1)
+    print("\nAll query plans use indexes")
+
+
+if __name__ == "__main__":
+    main()
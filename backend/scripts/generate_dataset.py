@@ -0,0 +1,284 @@
+"""
+Generate a large synthetic dataset for benchmarking
+
+    python scripts/generate_dataset.py --supports 100000
+    python scripts/generate_dataset.py --supports 50000000 --seed 7 --batch-size 100000
+    python scripts/generate_dataset.py --supports 100000 --now 2026-06-30T12:00:00
+
+Creates creators (with profiles, links and Stripe accounts acct_bench<N>),
+supporters and supports with skewed, realistic shapes:
+
+- supports per creator follow a power law (a few creators get most of them),
+  and so do supports per supporter
+- payment statuses are mostly completed, with pending, failed and refunded
+- created_at spans the --days before --now (a fixed date by default, not the
+  clock), growing towards it; supports are written in time order, like a
+  live database fills up
+
+The same --seed, sizes and --now always produce the same rows, timestamps
+and password hash included (only the aggregates' updated_at records when
+they were rebuilt). Rows go through app.core.bulk.insert_rows (COPY on
+PostgreSQL), one transaction per batch, then the support aggregates are
+rebuilt and the tables analyzed. Every generated user can log in with the
+printed password. Run it against an empty, migrated database (see
+scripts/reset_db.py).
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.bulk import insert_rows
+from app.core.config import settings
+from app.core.db import SessionLocal, engine
+from app.core.migrations import run_migrations
+from app.core.security import pwd_context
+from app.domains.auth.models import User
+from app.domains.creator.models import CreatorProfile, PlatformLink
+from app.domains.payment.models import StripeAccount
+from app.domains.support import aggregates
+from app.domains.support.models import Support, PaymentStatus
+
+EMAIL_DOMAIN = "bench.example.com"
+PASSWORD = "benchpass123"
+# End of the generated time range unless --now is given
+DEFAULT_NOW = datetime(2026, 1, 1)
+
+STATUSES = [PaymentStatus.COMPLETED, PaymentStatus.PENDING, PaymentStatus.FAILED, PaymentStatus.REFUNDED]
+STATUS_WEIGHTS = [85, 8, 5, 2]
+AMOUNTS = [150, 300, 500, 1000, 2000, 3000, 5000, 10000]
+AMOUNT_WEIGHTS = [10, 25, 30, 20, 7, 5, 2, 1]
+MESSAGES = [None, None, None, "Thank you!", "Love your work", "Keep it up!", "応援しています！"]
+PLATFORMS = ["YouTube", "Twitter", "Instagram", "TikTok", "Twitch", "Website"]
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = args.now.replace(microsecond=0)
+        # Users, profiles, links and accounts exist before the first support
+        self.start = self.now - timedelta(days=args.days)
+        self.counts = {"users": 0, "profiles": 0, "links": 0, "accounts": 0, "supports": 0}
+
+    def new_id(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def power_law_cum_weights(self, n: int, alpha: float):
+        """Cumulative weights for n items where the k-th ranked has weight 1/k^alpha."""
+        weights = [1 / (rank ** alpha) for rank in range(1, n + 1)]
+        return list(accumulate(weights))
+
+    def write(self, table, rows):
+        with engine.begin() as connection:
+            insert_rows(connection, table, rows)
+
+    def users(self, kind: str, count: int, is_creator: bool, hashed_password: str):
+        ids = []
+        batch = []
+        for index in range(count):
+            user_id = self.new_id()
+            ids.append(user_id)
+            batch.append({
+                "id": user_id,
+                "email": f"{kind}{index}@{EMAIL_DOMAIN}",
+                "username": f"bench{kind}{index}",
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_creator": is_creator,
+                "token_version": 0,
+                "created_at": self.start,
+            })
+            if len(batch) >= self.args.batch_size:
+                self.write(User.__table__, batch)
+                batch = []
+        self.write(User.__table__, batch)
+        self.counts["users"] += count
+        return ids
+
+    def flush_profiles(self, profiles, links, accounts):
+        self.write(CreatorProfile.__table__, profiles)
+        self.write(PlatformLink.__table__, links)
+        self.write(StripeAccount.__table__, accounts)
+        self.counts["profiles"] += len(profiles)
+        self.counts["links"] += len(links)
+        self.counts["accounts"] += len(accounts)
+
+    def profiles(self, creator_ids):
+        profiles, links, accounts = [], [], []
+        for index, creator_id in enumerate(creator_ids):
+            profile_id = self.new_id()
+            profiles.append({
+                "id": profile_id,
+                "user_id": creator_id,
+                "display_name": f"Bench Creator {index}",
+                "bio": f"Synthetic creator #{index} for benchmarks.",
+                "profile_image_url": None,
+                "header_image_url": None,
+                "created_at": self.start,
+            })
+            for order, platform in enumerate(self.rng.sample(PLATFORMS, self.rng.randint(0, 4))):
+                links.append({
+                    "id": self.new_id(),
+                    "creator_profile_id": profile_id,
+                    "platform_name": platform,
+                    "platform_url": f"https://{platform.lower()}.example.com/benchcreator{index}",
+                    "display_order": order,
+                    "created_at": self.start,
+                })
+            # Most creators finished Connect onboarding
+            onboarded = self.rng.random() < 0.9
+            accounts.append({
+                "user_id": creator_id,
+                "stripe_account_id": f"acct_bench{index}",
+                "charges_enabled": onboarded,
+                "payouts_enabled": onboarded,
+                "details_submitted": onboarded,
+                "country": "JP",
+                "default_currency": "jpy",
+                "created_at": self.start,
+            })
+            if len(profiles) >= self.args.batch_size:
+                self.flush_profiles(profiles, links, accounts)
+                profiles, links, accounts = [], [], []
+        self.flush_profiles(profiles, links, accounts)
+
+    def support_time(self, fraction: float) -> datetime:
+        """Map a 0..1 position in the stream to a timestamp.
+
+        Volume grows towards the present: the share of supports older than
+        a point of the range is that point's fraction squared.
+        """
+        return self.start + (self.now - self.start) * (fraction ** 0.5)
+
+    def supports(self, creator_ids, supporter_ids):
+        rng = self.rng
+        # Rank order is random, so popularity is unrelated to id or insert order
+        creators = rng.sample(creator_ids, len(creator_ids))
+        supporters = rng.sample(supporter_ids, len(supporter_ids))
+        creator_weights = self.power_law_cum_weights(len(creators), self.args.creator_alpha)
+        supporter_weights = self.power_law_cum_weights(len(supporters), self.args.supporter_alpha)
+
+        total = self.args.supports
+        started = time.perf_counter()
+        written = 0
+        while written < total:
+            size = min(self.args.batch_size, total - written)
+            batch_creators = rng.choices(creators, cum_weights=creator_weights, k=size)
+            batch_supporters = rng.choices(supporters, cum_weights=supporter_weights, k=size)
+            statuses = rng.choices(STATUSES, weights=STATUS_WEIGHTS, k=size)
+            amounts = rng.choices(AMOUNTS, weights=AMOUNT_WEIGHTS, k=size)
+            # Jitter within each row's slot of the time range; rows stay in time order
+            positions = [rng.random() for _ in range(size)]
+
+            rows = []
+            for i in range(size):
+                support_id = self.new_id()
+                status = statuses[i]
+                created_at = self.support_time((written + positions[i]) / total)
+                paid = status in (PaymentStatus.COMPLETED, PaymentStatus.REFUNDED)
+                rows.append({
+                    "id": support_id,
+                    "supporter_id": batch_supporters[i],
+                    "creator_id": batch_creators[i],
+                    "amount": amounts[i],
+                    "message": rng.choice(MESSAGES),
+                    "stripe_checkout_session_id": f"cs_bench_{support_id}",
+                    "stripe_payment_intent_id": f"pi_bench_{support_id}" if paid else None,
+                    "payment_status": status,
+                    "created_at": created_at,
+                    "completed_at": created_at + timedelta(seconds=rng.randint(5, 300)) if paid else None,
+                })
+                written += 1
+            self.write(Support.__table__, rows)
+            self.counts["supports"] = written
+
+            elapsed = time.perf_counter() - started
+            print(f"  {written}/{total} supports ({written / elapsed:.0f} rows/s)")
+
+    def rebuild_aggregates(self):
+        db = SessionLocal()
+        try:
+            after = None
+            while True:
+                after = aggregates.rebuild_creator_aggregates(db, after, self.args.aggregate_chunk_size)
+                if after is None:
+                    break
+        finally:
+            db.close()
+
+    def analyze(self):
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+
+    def run(self):
+        args = self.args
+        started = time.perf_counter()
+
+        # One shared hash keeps user generation fast; logins still verify it.
+        # Its salt comes from --seed so reruns store the same hash.
+        hashed_password = pwd_context.handler().using(
+            salt=random.Random(args.seed).randbytes(16), rounds=settings.PASSWORD_HASH_ROUNDS
+        ).hash(PASSWORD)
+
+        print(f"Creating {args.creators} creators and {args.supporters} supporters...")
+        creator_ids = self.users("creator", args.creators, True, hashed_password)
+        supporter_ids = self.users("supporter", args.supporters, False, hashed_password)
+        self.profiles(creator_ids)
+
+        print(f"Creating {args.supports} supports...")
+        self.supports(creator_ids, supporter_ids)
+
+        if not args.skip_aggregates:
+            print("Rebuilding support aggregates...")
+            step = time.perf_counter()
+            self.rebuild_aggregates()
+            print(f"  done in {time.perf_counter() - step:.1f}s")
+
+        self.analyze()
+        counts = self.counts
+        print(
+            f"Generated {counts['users']} users, {counts['profiles']} profiles, {counts['links']} links, "
+            f"{counts['accounts']} Stripe accounts and {counts['supports']} supports in {time.perf_counter() - started:.1f}s"
+        )
+        print(f"Log in as creator0@{EMAIL_DOMAIN} or supporter0@{EMAIL_DOMAIN} with password {PASSWORD}")
+
+
+def already_generated() -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(User.id).filter(User.email.like(f"%@{EMAIL_DOMAIN}")).first() is not None
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmarking dataset")
+    parser.add_argument("--supports", type=int, default=100000, help="number of supports")
+    parser.add_argument("--creators", type=int, help="default: supports / 200, at least 10")
+    parser.add_argument("--supporters", type=int, help="default: supports / 10, at least 100")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=730, help="time span of created_at")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=DEFAULT_NOW,
+                        help=f"end of the time span, UTC (default {DEFAULT_NOW.date()})")
+    parser.add_argument("--creator-alpha", type=float, default=1.1, help="power-law exponent of supports per creator")
+    parser.add_argument("--supporter-alpha", type=float, default=0.8, help="power-law exponent of supports per supporter")
+    parser.add_argument("--batch-size", type=int, default=50000, help="rows per transaction")
+    parser.add_argument("--aggregate-chunk-size", type=int, default=1000, help="users per aggregate rebuild transaction")
+    parser.add_argument("--skip-aggregates", action="store_true", help="leave the aggregate tables untouched")
+    args = parser.parse_args()
+    args.creators = args.creators or max(10, args.supports // 200)
+    args.supporters = args.supporters or max(100, args.supports // 10)
+
+    run_migrations()
+    if already_generated():
+        print(f"Users @{EMAIL_DOMAIN} already exist; reset the database first (scripts/reset_db.py).")
+        sys.exit(1)
+    Generator(args).run()
@@ -0,0 +1,285 @@
+"""
+Bulk import users, creator profiles and platform links from CSV or NDJSON
+
+    python scripts/import_users.py creators.ndjson
+    python scripts/import_users.py creators.csv --batch-size 5000 --hash-workers 8
+
+One record per line/row:
+
+    email            required, rows with an already registered email are skipped
+    password         plain text, hashed in parallel on import
+    password_hash    alternatively, an existing pbkdf2_sha256 hash
+    username         optional, generated from the email like /auth/register
+    is_creator       true/false (default false)
+    display_name     creates a creator profile (with bio, profile_image_url,
+                     header_image_url) when is_creator is true
+    links            list of {"platform_name", "platform_url"}; in CSV a JSON
+                     array in one column
+
+The file is streamed and inserted in batches (COPY on PostgreSQL, executemany
+elsewhere), one transaction per batch, so memory stays flat and an
+interrupted import can be re-run: rows already imported are skipped by email.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.bulk import insert_rows
+from app.core.db import SessionLocal
+from app.core.security import pwd_context
+from app.domains.auth.models import User
+from app.domains.auth.service import (
+    generate_username_from_email, taken_username_suffixes, taken_username_suffixes_many
+)
+from app.domains.creator.models import CreatorProfile, PlatformLink
+from app.domains.payment.models import StripeAccount  # noqa: F401 (registers table)
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+_TRAILING_DIGITS = re.compile(r"[0-9]*$")
+
+
+def read_records(path: Path, fmt: str):
+    """Yield (line number, record dict) without loading the file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                if row.get("links"):
+                    row["links"] = json.loads(row["links"])
+                yield line_no, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+
+
+def as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+class UsernameAllocator:
+    """Hands out generated usernames without a query per name.
+
+    Taken suffixes are loaded once per base name and kept in a bounded LRU.
+    Names chosen in the current, uncommitted batch are tracked separately
+    so a base loaded mid-batch still sees them.
+    """
+
+    def __init__(self, max_bases: int = 100000):
+        self.max_bases = max_bases
+        self._bases = OrderedDict()  # base -> [taken suffixes, next counter]
+        self._pending = {}  # base -> suffixes used in the open batch
+
+    def _splits(self, name: str):
+        # "info12" is suffix "12" of "info", "2" of "info1" and "" of "info12"
+        digits_start = _TRAILING_DIGITS.search(name).start()
+        for cut in range(digits_start, len(name) + 1):
+            yield name[:cut], name[cut:]
+
+    def reserve(self, name: str):
+        """Record a name as taken in the open batch."""
+        for base, suffix in self._splits(name):
+            self._pending.setdefault(base, set()).add(suffix)
+            if base in self._bases:
+                self._bases[base][0].add(suffix)
+
+    def is_reserved(self, name: str) -> bool:
+        """True if the open batch already uses this exact name."""
+        return "" in self._pending.get(name, ())
+
+    def batch_committed(self):
+        self._pending = {}
+
+    def _add(self, base: str, taken: set) -> list:
+        entry = self._bases[base] = [taken | self._pending.get(base, set()), 1]
+        if len(self._bases) > self.max_bases:
+            self._bases.popitem(last=False)
+        return entry
+
+    def preload(self, db, bases):
+        """Load every base not cached yet in one query."""
+        missing = {base for base in bases if base not in self._bases}
+        for base, taken in taken_username_suffixes_many(db, missing).items():
+            self._add(base, taken)
+
+    def allocate(self, db, base: str) -> str:
+        entry = self._bases.get(base)
+        if entry is None:
+            entry = self._add(base, taken_username_suffixes(db, base))
+        else:
+            self._bases.move_to_end(base)
+
+        taken, counter = entry
+        if "" not in taken:
+            name = base
+        else:
+            while str(counter) in taken:
+                counter += 1
+            entry[1] = counter + 1
+            name = f"{base}{counter}"
+        self.reserve(name)
+        return name
+
+
+class Importer:
+    def __init__(self, hash_workers: int):
+        self.hasher = ThreadPoolExecutor(max_workers=hash_workers, thread_name_prefix="import-hasher")
+        self.usernames = UsernameAllocator()
+        self.counts = {"read": 0, "users": 0, "profiles": 0, "links": 0, "skipped": 0}
+        self.errors_shown = 0
+
+    def skip(self, line_no: int, reason: str):
+        self.counts["skipped"] += 1
+        if self.errors_shown < 20:
+            print(f"  line {line_no}: skipped, {reason}")
+            self.errors_shown += 1
+
+    def import_batch(self, batch):
+        self.counts["read"] += len(batch)
+
+        db = SessionLocal()
+        try:
+            emails = {str(record.get("email") or "").strip() for _, record in batch}
+            registered = {
+                email for (email,) in db.query(User.email).filter(User.email.in_(emails))
+            }
+            wanted_names = {record["username"] for _, record in batch if record.get("username")}
+            taken_names = {
+                name for (name,) in db.query(User.username).filter(User.username.in_(wanted_names))
+            }
+            self.usernames.preload(db, {
+                generate_username_from_email(str(record.get("email") or "").strip())
+                for _, record in batch if not record.get("username")
+            })
+
+            # Hash only rows that will be inserted; the rest of the batch is
+            # checked while the hashes run, and a re-run hashes nothing
+            accepted = []
+            seen_emails = set()
+            for line_no, record in batch:
+                email = str(record.get("email") or "").strip()
+                if not email or "@" not in email:
+                    self.skip(line_no, "missing or invalid email")
+                    continue
+                if email in registered or email in seen_emails:
+                    self.skip(line_no, f"{email} already registered")
+                    continue
+
+                password = None if record.get("password_hash") else record.get("password")
+                if not password and not (
+                    record.get("password_hash") and pwd_context.identify(record["password_hash"])
+                ):
+                    self.skip(line_no, "no password or unrecognized password_hash")
+                    continue
+
+                username = record.get("username")
+                if username:
+                    # Taken in the database, or generated earlier in this batch
+                    if username in taken_names or self.usernames.is_reserved(username):
+                        self.skip(line_no, f"username {username} already taken")
+                        continue
+                    taken_names.add(username)
+                    self.usernames.reserve(username)
+                else:
+                    username = self.usernames.allocate(db, generate_username_from_email(email))
+                seen_emails.add(email)
+
+                pending_hash = self.hasher.submit(pwd_context.hash, password) if password else None
+                accepted.append((record, email, username, pending_hash))
+
+            users, profiles, links = [], [], []
+            for record, email, username, pending_hash in accepted:
+                user_id = str(uuid.uuid4())
+                is_creator = as_bool(record.get("is_creator"))
+                users.append({
+                    "id": user_id,
+                    "email": email,
+                    "username": username,
+                    "hashed_password": pending_hash.result() if pending_hash else record["password_hash"],
+                    "is_active": True,
+                    "is_creator": is_creator,
+                })
+
+                if is_creator and record.get("display_name"):
+                    profile_id = str(uuid.uuid4())
+                    profiles.append({
+                        "id": profile_id,
+                        "user_id": user_id,
+                        "display_name": record["display_name"][:100],
+                        "bio": record.get("bio") or None,
+                        "profile_image_url": record.get("profile_image_url") or None,
+                        "header_image_url": record.get("header_image_url") or None,
+                    })
+                    for order, link in enumerate(record.get("links") or []):
+                        links.append({
+                            "id": str(uuid.uuid4()),
+                            "creator_profile_id": profile_id,
+                            "platform_name": link["platform_name"][:50],
+                            "platform_url": link["platform_url"][:500],
+                            "display_order": order,
+                        })
+
+            connection = db.connection()
+            insert_rows(connection, User.__table__, users)
+            insert_rows(connection, CreatorProfile.__table__, profiles)
+            insert_rows(connection, PlatformLink.__table__, links)
+            db.commit()
+            self.usernames.batch_committed()
+        finally:
+            db.close()
+
+        self.counts["users"] += len(users)
+        self.counts["profiles"] += len(profiles)
+        self.counts["links"] += len(links)
+
+    def close(self):
+        self.hasher.shutdown()
+
+
+def run(path: Path, fmt: str, batch_size: int, hash_workers: int):
+    importer = Importer(hash_workers)
+    records = read_records(path, fmt)
+    started = time.perf_counter()
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            importer.import_batch(batch)
+            elapsed = time.perf_counter() - started
+            counts = importer.counts
+            print(
+                f"{counts['read']} read, {counts['users']} users, {counts['profiles']} profiles, "
+                f"{counts['links']} links, {counts['skipped']} skipped "
+                f"({counts['read'] / elapsed:.0f} rows/s)"
+            )
+    finally:
+        importer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Import complete in {elapsed:.1f}s ({importer.counts['read'] / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import users and creator profiles")
+    parser.add_argument("path", type=Path, help="CSV or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per transaction")
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 4, help="password hashing threads")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "ndjson")
+    run(args.path, fmt, args.batch_size, args.hash_workers)
@@ -0,0 +1,16 @@
+"""
+Apply database migrations (release step, run before starting the API)
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.migrations import run_migrations
+
+if __name__ == "__main__":
+    revision = sys.argv[1] if len(sys.argv) > 1 else "head"
+    print(f"Migrating database to {revision}...")
+    run_migrations(revision)
+    print("Database is up to date!")
@@ -0,0 +1,83 @@
+"""
+Inspect and drain the webhook inbox (webhook_events)
+
+    python scripts/process_webhooks.py                  # drain until stopped (Ctrl-C)
+    python scripts/process_webhooks.py --once           # drain what is due now, then exit
+    python scripts/process_webhooks.py --status         # count events per status
+    python scripts/process_webhooks.py --requeue-failed # retry events that ran out of attempts
+    python scripts/process_webhooks.py --purge-days 30  # delete events processed before then
+
+API processes drain the inbox themselves unless WEBHOOK_WORKER_ENABLED is
+false; run this instead (or as well) to process it elsewhere. Any number of
+drainers can run at once.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.db import SessionLocal
+from app.domains.webhook import service
+from app.domains.webhook.worker import webhook_worker
+
+
+def with_session(fn, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def drain_once():
+    started = time.perf_counter()
+    total = 0
+    while True:
+        claimed = webhook_worker.drain_once()
+        if not claimed:
+            break
+        total += claimed
+    stats = webhook_worker.snapshot()
+    print(
+        f"Drained {total} events in {time.perf_counter() - started:.1f}s "
+        f"({stats['processed']} processed, {stats['retried']} to retry, {stats['gave_up']} failed)"
+    )
+
+
+def drain_forever():
+    print("Draining the webhook inbox, Ctrl-C to stop...")
+    webhook_worker.start()
+    try:
+        while True:
+            time.sleep(60)
+            print(webhook_worker.snapshot())
+    except KeyboardInterrupt:
+        print("Stopping after the current batch...")
+    finally:
+        webhook_worker.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and drain the webhook inbox")
+    parser.add_argument("--once", action="store_true", help="exit when nothing is due")
+    parser.add_argument("--status", action="store_true", help="only count events per status")
+    parser.add_argument("--requeue-failed", action="store_true", help="reset FAILED events to pending")
+    parser.add_argument("--purge-days", type=int, help="delete events processed more than this many days ago")
+    args = parser.parse_args()
+
+    if args.status:
+        for status, count in with_session(service.count_by_status).items():
+            print(f"{status:<12}{count:>10}")
+    elif args.requeue_failed:
+        print(f"Requeued {with_session(service.requeue_failed_events)} failed events")
+    elif args.purge_days is not None:
+        older_than = datetime.utcnow() - timedelta(days=args.purge_days)
+        print(f"Deleted {with_session(service.purge_processed_events, older_than)} processed events")
+    elif args.once:
+        drain_once()
+    else:
+        drain_forever()
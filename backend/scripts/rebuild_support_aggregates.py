@@ -0,0 +1,63 @@
+"""
+Rebuild or verify the support aggregates (creator_support_totals,
+creator_daily_earnings and supporter_creator_totals) from the supports table
+
+    python scripts/rebuild_support_aggregates.py           # rebuild all users
+    python scripts/rebuild_support_aggregates.py --verify  # report drift, exit 1 if any
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.db import SessionLocal
+from app.domains.support import aggregates
+
+
+def rebuild(chunk_size: int):
+    db = SessionLocal()
+    started = time.perf_counter()
+    processed = 0
+    try:
+        after = None
+        while True:
+            after = aggregates.rebuild_creator_aggregates(db, after, chunk_size)
+            if after is None:
+                break
+            processed += chunk_size
+            print(f"Rebuilt aggregates for ~{processed} users (last id {after})")
+    finally:
+        db.close()
+    print(f"Rebuild complete in {time.perf_counter() - started:.1f}s")
+
+
+def verify(chunk_size: int) -> int:
+    db = SessionLocal()
+    mismatches = 0
+    try:
+        after = None
+        while True:
+            after, found = aggregates.verify_creator_aggregates(db, after, chunk_size)
+            if after is None:
+                break
+            for key, stored, actual in found:
+                print(f"Mismatch for {key}: stored {stored}, supports {actual}")
+            mismatches += len(found)
+    finally:
+        db.close()
+    print(f"Verification complete: {mismatches} mismatched rows")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild or verify support aggregates")
+    parser.add_argument("--verify", action="store_true", help="only compare, do not write")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="users per transaction")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(1 if verify(args.chunk_size) else 0)
+    rebuild(args.chunk_size)
@@ -9,20 +9,25 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.core.db import engine, Base, SessionLocal
+from app.core.migrations import run_migrations
 from app.domains.auth.models import User
 from app.domains.creator.models import CreatorProfile
 from app.domains.payment.models import StripeAccount  # Import payment models
+from app.domains.webhook.models import WebhookEvent  # So drop_all includes the inbox
 from app.core.security import get_password_hash
 from datetime import datetime
+from sqlalchemy import text
 import uuid
 
 def reset_database():
     """Drop all tables and recreate them"""
     print("Dropping all tables...")
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
     
-    print("Creating all tables...")
-    Base.metadata.create_all(bind=engine)
+    print("Running migrations...")
+    run_migrations()
     
     print("Database reset complete!")
 
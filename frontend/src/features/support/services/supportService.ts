@@ -20,13 +20,17 @@ export const supportService = {
     return response.data;
   },
 
-  async getReceivedSupports(): Promise<CreatorSupportSummary> {
-    const response = await apiClient.get<CreatorSupportSummary>('/support/received');
+  async getReceivedSupports(cursor?: string, limit?: number): Promise<CreatorSupportSummary> {
+    const response = await apiClient.get<CreatorSupportSummary>('/support/received', {
+      params: { cursor, limit },
+    });
     return response.data;
   },
 
-  async getGivenSupports(): Promise<SupporterSummary> {
-    const response = await apiClient.get<SupporterSummary>('/support/given');
+  async getGivenSupports(cursor?: string, limit?: number): Promise<SupporterSummary> {
+    const response = await apiClient.get<SupporterSummary>('/support/given', {
+      params: { cursor, limit },
+    });
     return response.data;
   },
 
@@ -47,12 +47,14 @@ export interface CreatorSupportSummary {
   total_received: number;
   supporter_count: number;
   recent_supports: SupportWithUsers[];
+  next_cursor?: string | null;  // pass back to fetch the next page
 }
 
 export interface SupporterSummary {
   total_given: number;
   creator_count: number;
   recent_supports: SupportWithUsers[];
+  next_cursor?: string | null;  // pass back to fetch the next page
 }
 
 export interface StripeConfig {
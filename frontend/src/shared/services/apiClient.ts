@@ -3,6 +3,10 @@ import type { AxiosInstance, AxiosError } from 'axios';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// After a write the API pins reads to the primary database until this time
+const PRIMARY_UNTIL_HEADER = 'X-Primary-Until';
+const PRIMARY_UNTIL_KEY = 'primary_until';
+
 class ApiClient {
   private instance: AxiosInstance;
 
@@ -21,6 +25,10 @@ class ApiClient {
         if (token) {
           config.headers.Authorization = `Bearer ${token}`;
         }
+        const primaryUntil = localStorage.getItem(PRIMARY_UNTIL_KEY);
+        if (primaryUntil && Number(primaryUntil) * 1000 > Date.now()) {
+          config.headers[PRIMARY_UNTIL_HEADER] = primaryUntil;
+        }
         return config;
       },
       (error) => Promise.reject(error)
@@ -28,7 +36,13 @@ class ApiClient {
 
     // Response interceptor for error handling
     this.instance.interceptors.response.use(
-      (response) => response,
+      (response) => {
+        const primaryUntil = response.headers[PRIMARY_UNTIL_HEADER.toLowerCase()];
+        if (primaryUntil) {
+          localStorage.setItem(PRIMARY_UNTIL_KEY, primaryUntil);
+        }
+        return response;
+      },
       (error: AxiosError) => {
         if (error.response?.status === 401) {
           // Token expired or invalid